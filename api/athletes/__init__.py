@@ -0,0 +1,18 @@
+"""
+Multi-athlete tenancy: per-athlete credentials and personas, routed by the
+webhook ``owner_id``.
+"""
+from .models import AthleteRecord
+from .registry import Athlete, AthleteRegistry
+from .store import AthleteStore, FileAthleteStore, MemoryAthleteStore, SQLiteAthleteStore, build_athlete_store
+
+__all__ = [
+    "Athlete",
+    "AthleteRecord",
+    "AthleteRegistry",
+    "AthleteStore",
+    "FileAthleteStore",
+    "MemoryAthleteStore",
+    "SQLiteAthleteStore",
+    "build_athlete_store",
+]
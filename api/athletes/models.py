@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from gemini.models import Persona
+
+
+class AthleteRecord(BaseModel):
+    """Credentials and persona for one Strava athlete (webhook ``owner_id``)."""
+    athlete_id: int
+    refresh_token: str
+    persona: Persona = Persona()
@@ -0,0 +1,127 @@
+"""
+Routing webhook owners to warm, per-athlete Strava clients.
+
+Each athlete gets its own client and token manager, kept in a bounded LRU so
+a warm process answers repeat owners without a store lookup or a refresh.
+All of them share one connection pool and one rate-limit governor, since
+Strava's limits apply to the application, not the athlete. Warm entries are
+re-checked against the store after ``strava_athlete_cache_ttl`` seconds, so
+a re-registration reaches processes that did not make it.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+import httpx
+from gemini.models import Persona
+from strava.client import StravaAPIClient, build_http_client
+from strava.models import StravaConfig
+from strava.ratelimit import RateLimitGovernor
+from strava.tokens import DEFAULT_TOKEN_KEY, TokenManager, TokenStore, build_token_store
+from .models import AthleteRecord
+from .store import AthleteStore, build_athlete_store
+
+
+class Athlete:
+    def __init__(
+        self,
+        athlete_id: int,
+        strava_client: StravaAPIClient,
+        persona: Persona,
+        record: Optional[AthleteRecord] = None,
+    ):
+        self.athlete_id = athlete_id
+        self.strava_client = strava_client
+        self.persona = persona
+        # None for owners on the default credentials
+        self.record = record
+        self.checked_at = time.monotonic()
+
+
+class AthleteRegistry:
+    def __init__(
+        self,
+        settings: StravaConfig,
+        store: Optional[AthleteStore] = None,
+        token_store: Optional[TokenStore] = None,
+        maxsize: Optional[int] = None,
+    ):
+        self.settings = settings
+        self.store = store or build_athlete_store(settings)
+        self.token_store = token_store or build_token_store(settings)
+        self.governor = RateLimitGovernor(settings.strava_rate_limit_reserve)
+        self.maxsize = maxsize or settings.strava_athlete_cache_size
+        self.ttl = settings.strava_athlete_cache_ttl
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._athletes: "OrderedDict[int, Athlete]" = OrderedDict()
+        self._default: Optional[StravaAPIClient] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """The connection pool shared by every athlete's client."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = build_http_client(self.settings)
+        return self._http_client
+
+    def _client(self, refresh_token: str, key: str) -> StravaAPIClient:
+        token_manager = TokenManager(
+            self.token_store,
+            refresh_token,
+            refresh_margin=self.settings.strava_token_refresh_margin,
+            key=key,
+        )
+        return StravaAPIClient(self.settings, self.http_client, token_manager, self.governor)
+
+    def _default_client(self) -> StravaAPIClient:
+        # One client for every owner on the default credentials, so they share
+        # a single token manager and refresh
+        if self._default is None:
+            self._default = self._client(self.settings.strava_refresh_token, DEFAULT_TOKEN_KEY)
+        return self._default
+
+    def _uses_default(self, athlete_id: int) -> bool:
+        if not self.settings.strava_refresh_token:
+            return False
+        return self.settings.strava_athlete_id in (None, athlete_id)
+
+    def get(self, athlete_id: int) -> Optional[Athlete]:
+        """The athlete's client and persona, or None if we hold no credentials."""
+        athlete = self._athletes.get(athlete_id)
+        if athlete is not None and time.monotonic() - athlete.checked_at < self.ttl:
+            self._athletes.move_to_end(athlete_id)
+            return athlete
+
+        record = self.store.get(athlete_id)
+        if athlete is not None and record == athlete.record:
+            athlete.checked_at = time.monotonic()
+            self._athletes.move_to_end(athlete_id)
+            return athlete
+        if athlete is not None and athlete.record is not None and (
+            record is None or record.refresh_token != athlete.record.refresh_token
+        ):
+            # Re-authorized or removed: the rotated pair belongs to the old grant
+            self.token_store.delete(str(athlete_id))
+
+        if record is not None:
+            athlete = Athlete(athlete_id, self._client(record.refresh_token, str(athlete_id)), record.persona, record)
+        elif self._uses_default(athlete_id):
+            athlete = Athlete(athlete_id, self._default_client(), Persona())
+        else:
+            self._athletes.pop(athlete_id, None)
+            return None
+        self._athletes[athlete_id] = athlete
+        self._athletes.move_to_end(athlete_id)
+        # Evicted athletes keep their tokens in the token store
+        while len(self._athletes) > self.maxsize:
+            self._athletes.popitem(last=False)
+        return athlete
+
+    def register(self, record: AthleteRecord):
+        """Save a record, replacing any stored tokens and warm state for the athlete."""
+        self.store.save(record)
+        self.token_store.delete(str(record.athlete_id))
+        self._athletes.pop(record.athlete_id, None)
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
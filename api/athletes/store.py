@@ -0,0 +1,89 @@
+"""
+Per-athlete credential records, keyed by Strava athlete id.
+
+The stores mirror the token stores: process memory, a JSON file, or SQLite.
+They only hold the initial refresh token; rotated tokens live in the token
+store under the athlete's key.
+"""
+import json
+import os
+import sqlite3
+from typing import Dict, Optional, Protocol
+from strava.models import StravaConfig
+from .models import AthleteRecord
+
+
+class AthleteStore(Protocol):
+    def get(self, athlete_id: int) -> Optional[AthleteRecord]: ...
+    def save(self, record: AthleteRecord) -> None: ...
+
+
+class MemoryAthleteStore:
+    def __init__(self):
+        self._records: Dict[int, AthleteRecord] = {}
+
+    def get(self, athlete_id: int) -> Optional[AthleteRecord]:
+        return self._records.get(athlete_id)
+
+    def save(self, record: AthleteRecord) -> None:
+        self._records[record.athlete_id] = record
+
+
+class FileAthleteStore:
+    """JSON file of records keyed by athlete id, e.g. shipped with the bundle."""
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, athlete_id: int) -> Optional[AthleteRecord]:
+        data = self._read().get(str(athlete_id))
+        return AthleteRecord(**data) if data else None
+
+    def save(self, record: AthleteRecord) -> None:
+        data = self._read()
+        data[str(record.athlete_id)] = record.model_dump()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class SQLiteAthleteStore:
+    def __init__(self, path: str):
+        self.path = path
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS strava_athletes ("
+                "athlete_id INTEGER PRIMARY KEY, record TEXT NOT NULL)"
+            )
+
+    def get(self, athlete_id: int) -> Optional[AthleteRecord]:
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT record FROM strava_athletes WHERE athlete_id = ?", (athlete_id,)
+            ).fetchone()
+        return AthleteRecord.model_validate_json(row[0]) if row else None
+
+    def save(self, record: AthleteRecord) -> None:
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO strava_athletes (athlete_id, record) VALUES (?, ?)",
+                (record.athlete_id, record.model_dump_json())
+            )
+
+
+def build_athlete_store(settings: StravaConfig) -> AthleteStore:
+    """Build the athlete store selected by ``strava_athlete_store``."""
+    if settings.strava_athlete_store == "file":
+        return FileAthleteStore(settings.strava_athlete_path)
+    if settings.strava_athlete_store == "sqlite":
+        return SQLiteAthleteStore(settings.strava_athlete_path)
+    return MemoryAthleteStore()
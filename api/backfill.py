@@ -0,0 +1,238 @@
+"""
+Re-caption historical activities with the Klaus pipeline.
+
+Activities are streamed newest first and processed with bounded concurrency.
+Progress is checkpointed as a ``before`` cursor, so an interrupted run resumes
+where it stopped; failed activities are kept in the checkpoint too and are
+retried first when it does. Results, including failures, are written to
+stdout as JSON lines.
+
+    python api/backfill.py --after 2025-01-01 --concurrency 4 --dry-run
+    python api/backfill.py --batch-size 10 --concurrency 2
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from config import Settings
+from athletes import AthleteRegistry
+from gemini import GeminiAPIClient
+from gemini.models import Persona
+from history import ActivityStore
+from pipeline import CaptionResult, caption_activities, caption_activity
+import telemetry
+from strava import StravaAPIClient
+from strava.models import SummaryActivity
+from strava.ratelimit import PRIORITY_BACKFILL
+
+
+class Checkpoint:
+    """Low-water mark of the stream: everything newer than ``before`` is done,
+    except the ``failed`` activities, which are left to retry.
+
+    Only in-flight and failed activities are tracked, so memory is bounded by
+    concurrency plus failures.
+    """
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.before: Optional[int] = None
+        self.failed: Set[int] = set()
+        self._in_flight: "OrderedDict[int, list]" = OrderedDict()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.before = state.get("before")
+            self.failed = set(state.get("failed", []))
+
+    def start(self, activity: SummaryActivity):
+        self._in_flight[activity.id] = [int(activity.start_date.timestamp()), False]
+
+    def finish(self, activity_id: int, failed: bool = False):
+        if failed:
+            self.failed.add(activity_id)
+        else:
+            self.failed.discard(activity_id)
+        if activity_id not in self._in_flight:
+            # A retry of an earlier failure; the cursor is already past it
+            self.save()
+            return
+        self._in_flight[activity_id][1] = True
+        advanced = False
+        while self._in_flight:
+            start, is_done = next(iter(self._in_flight.values()))
+            if not is_done:
+                break
+            self._in_flight.popitem(last=False)
+            self.before = start
+            advanced = True
+        if advanced:
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"before": self.before, "failed": sorted(self.failed)}, f)
+        os.replace(tmp_path, self.path)
+
+
+async def run_backfill(
+    strava_client: StravaAPIClient,
+    gemini_client: GeminiAPIClient,
+    checkpoint: Checkpoint,
+    after: Optional[int] = None,
+    concurrency: int = 4,
+    per_page: int = 100,
+    dry_run: bool = False,
+    history: Optional[ActivityStore] = None,
+    persona: Optional[Persona] = None,
+    batch_size: int = 1,
+) -> dict:
+    """Caption every activity, ``concurrency`` at a time; with ``batch_size``
+    over 1 each worker takes that many and generates their posts together."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"captioned": 0, "hidden": 0, "failed": 0}
+
+    async def produce():
+        # Failures from an earlier run first; the stream no longer covers them
+        retries = sorted(checkpoint.failed, reverse=True)
+        for i in range(0, len(retries), batch_size):
+            await queue.put(retries[i:i + batch_size])
+        batch = []
+        # Filter on ``after`` here: passing it to Strava flips the list to
+        # oldest first, which the ``before`` checkpoint cannot resume from
+        async for activity in strava_client.iter_activities(checkpoint.before, None, per_page, PRIORITY_BACKFILL):
+            if after is not None and activity.start_date.timestamp() <= after:
+                break
+            checkpoint.start(activity)
+            batch.append(activity.id)
+            if len(batch) == batch_size:
+                await queue.put(batch)
+                batch = []
+        if batch:
+            await queue.put(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    def report(result: CaptionResult):
+        counts[result.action] += 1
+        print(result.model_dump_json(exclude_none=True), flush=True)
+
+    async def consume_batch(activity_ids: List[int]):
+        try:
+            with telemetry.trace("backfill", activity_ids=activity_ids):
+                results = await caption_activities(
+                    strava_client,
+                    gemini_client,
+                    activity_ids,
+                    priority=PRIORITY_BACKFILL,
+                    dry_run=dry_run,
+                    history=history,
+                    persona=persona,
+                    batch_size=batch_size,
+                )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            results = [CaptionResult(activity_id=activity_id, action="failed", error=error) for activity_id in activity_ids]
+        for result in results:
+            report(result)
+        done = {result.activity_id for result in results if result.action != "failed"}
+        for activity_id in activity_ids:
+            checkpoint.finish(activity_id, failed=activity_id not in done)
+
+    async def consume():
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            if batch_size > 1:
+                await consume_batch(batch)
+                continue
+            activity_id = batch[0]
+            failed = False
+            try:
+                with telemetry.trace("backfill", activity_id=activity_id):
+                    result = await caption_activity(
+                        strava_client,
+                        gemini_client,
+                        activity_id,
+                        priority=PRIORITY_BACKFILL,
+                        dry_run=dry_run,
+                        history=history,
+                        persona=persona,
+                    )
+                report(result)
+            except Exception as e:
+                failed = True
+                counts["failed"] += 1
+                print(json.dumps({"activity_id": activity_id, "error": f"{type(e).__name__}: {e}"}), flush=True)
+            checkpoint.finish(activity_id, failed)
+
+    await asyncio.gather(produce(), *[consume() for _ in range(concurrency)])
+    return counts
+
+
+def parse_date(value: str) -> int:
+    date = datetime.fromisoformat(value)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp())
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Re-caption historical Strava activities.")
+    parser.add_argument("--before", type=parse_date, help="Only activities before this ISO date")
+    parser.add_argument("--after", type=parse_date, help="Only activities after this ISO date")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="Resume file; '' to disable")
+    parser.add_argument("--dry-run", action="store_true", help="Generate posts without updating Strava")
+    parser.add_argument("--sync-history", action="store_true", help="Sync the history store (history_path) first")
+    parser.add_argument("--batch-size", type=int, default=1, help="Activities per Gemini request")
+    parser.add_argument("--athlete-id", type=int, help="Athlete to backfill; defaults to the default credentials")
+    args = parser.parse_args()
+
+    settings = Settings()
+    telemetry.configure(settings.telemetry_mode, settings.telemetry_namespace)
+    persona = None
+    if args.athlete_id is None:
+        strava_client = StravaAPIClient(settings)
+    else:
+        athlete = AthleteRegistry(settings).get(args.athlete_id)
+        if athlete is None:
+            raise SystemExit(f"No credentials for athlete {args.athlete_id}")
+        strava_client, persona = athlete.strava_client, athlete.persona
+    gemini_client = GeminiAPIClient(settings)
+    history = ActivityStore(settings.history_path) if settings.history_path else None
+    # Dry runs never move the checkpoint a real run would resume from
+    checkpoint = Checkpoint(None if args.dry_run else args.checkpoint or None)
+    if args.before:
+        checkpoint.before = min(args.before, checkpoint.before or args.before)
+    try:
+        if history and args.sync_history:
+            athlete_id = args.athlete_id or (await strava_client.get_athlete(PRIORITY_BACKFILL))["id"]
+            added = await history.sync(strava_client, athlete_id)
+            print(json.dumps({"history_synced": added}), flush=True)
+        counts = await run_backfill(
+            strava_client,
+            gemini_client,
+            checkpoint,
+            after=args.after,
+            concurrency=args.concurrency,
+            per_page=args.per_page,
+            dry_run=args.dry_run,
+            history=history,
+            persona=persona,
+            batch_size=args.batch_size,
+        )
+    finally:
+        await strava_client.aclose()
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
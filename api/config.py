@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,7 +6,59 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8')
     strava_client_id: str
     strava_client_secret: str
-    strava_refresh_token: str
+    # Default credentials, used for owners without an athlete record; set
+    # strava_athlete_id to limit them to the athlete they belong to
+    strava_refresh_token: Optional[str] = None
+    strava_athlete_id: Optional[int] = None
     strava_base_url: str = "https://www.strava.com/api/v3"
+    # Shared Strava connection pool
+    strava_http2: bool = False
+    strava_timeout: float = 10.0
+    strava_connect_timeout: float = 5.0
+    strava_max_connections: int = 20
+    strava_max_keepalive_connections: int = 10
+    strava_keepalive_expiry: float = 30.0
+    # Token persistence: "memory", "file" or "sqlite"
+    strava_token_store: str = "memory"
+    strava_token_path: str = "/tmp/strava_tokens.json"
+    strava_token_refresh_margin: int = 300
+    strava_rate_limit_reserve: float = 0.2
+    strava_rate_limit_retries: int = 3
+    # Per-athlete credentials and personas: "memory", "file" or "sqlite"
+    strava_athlete_store: str = "memory"
+    strava_athlete_path: str = "/tmp/strava_athletes.json"
+    strava_athlete_cache_size: int = 256
+    # How long a warm athlete is served before its record is re-read
+    strava_athlete_cache_ttl: float = 300
+    # Webhook processing queue: "asyncio" or "sqlite"
+    webhook_queue_backend: str = "asyncio"
+    webhook_queue_path: str = "/tmp/klaus_jobs.db"
+    webhook_queue_maxsize: int = 1000
+    webhook_workers: int = 4
+    webhook_max_attempts: int = 3
+    webhook_retry_backoff: float = 2.0
+    # Webhook dedup; set webhook_dedup_path to persist across processes
+    webhook_dedup_ttl: float = 86400
+    webhook_dedup_lease: float = 900
+    webhook_dedup_maxsize: int = 10000
+    webhook_dedup_path: Optional[str] = None
+    # Local activity history for prompt context; unset to disable
+    history_path: Optional[str] = None
     gemini_api_key: str
     gemini_model_name: str = "gemini-2.5-flash"
+    gemini_base_url: Optional[str] = None
+    gemini_prompt_max_fields: int = 20
+    # -1 lets the model think as long as it wants; 0 disables thinking
+    gemini_thinking_budget: int = 512
+    gemini_deadline: float = 20.0
+    gemini_cache_size: int = 1024
+    gemini_cache_ttl: float = 604800
+    gemini_cache_path: Optional[str] = None
+    # Batched generation for bulk captioning (backfill --batch-size); the
+    # concurrency caps model requests across all batches in the process
+    gemini_batch_size: int = 10
+    gemini_batch_concurrency: int = 4
+    gemini_batch_deadline: float = 60.0
+    # Per-event spans and metrics: "off", "json" log lines or CloudWatch "emf"
+    telemetry_mode: str = "off"
+    telemetry_namespace: str = "KlausStravaAI"
@@ -1,3 +1,9 @@
-from .client import GeminiAPIClient
+__all__ = ["GeminiAPIClient"]
 
-__all__ = ["GeminiAPIClient"]
\ No newline at end of file
+
+def __getattr__(name: str):
+    # The client pulls in google.genai, the heaviest import in the app
+    if name == "GeminiAPIClient":
+        from .client import GeminiAPIClient
+        return GeminiAPIClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
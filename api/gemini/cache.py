@@ -0,0 +1,83 @@
+"""
+Content-addressed cache of generated posts.
+
+Keys hash the model name, system instructions and prompt payload, so an
+identical request is answered without a model call. The in-memory tier is a
+bounded TTL/LRU cache; an optional SQLite file keeps posts across restarts.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from cachetools import TTLCache
+from .models import GeminiPost
+
+
+def post_cache_key(model_name: str, system_instructions: str, prompt: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model_name, system_instructions, prompt):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SQLitePostTier:
+    """On-disk post cache entries.
+
+    The client, and so this connection, may be built on a worker thread and
+    used from the event loop; a lock serializes access across threads.
+    """
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS gemini_posts ("
+            "key TEXT PRIMARY KEY, post TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[GeminiPost]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT post FROM gemini_posts WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return GeminiPost.model_validate_json(row[0]) if row else None
+
+    def set(self, key: str, post: GeminiPost, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO gemini_posts (key, post, expires_at) VALUES (?, ?, ?)",
+                (key, post.model_dump_json(), time.time() + ttl)
+            )
+
+
+class PostCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 604800, persistent: Optional[SQLitePostTier] = None):
+        self.ttl = ttl
+        self.persistent = persistent
+        self._posts: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[GeminiPost]:
+        post = self._posts.get(key)
+        if post is None and self.persistent:
+            post = self.persistent.get(key)
+            if post:
+                self.disk_hits += 1
+                self._posts[key] = post
+        if post is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return post
+
+    def set(self, key: str, post: GeminiPost) -> None:
+        self._posts[key] = post
+        if self.persistent:
+            self.persistent.set(key, post, self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "size": len(self._posts)}
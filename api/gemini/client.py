@@ -1,49 +1,227 @@
 from google import genai
 from google.genai import types
-from .models import GeminiSettings, GeminiPost
+from .models import GeminiSettings, GeminiBatchPost, GeminiPost, Persona
 from strava.models import DetailedActivity
-from .prompt import KLAUS_SYSTEM_INSTRUCTIONS, generate_prompt
-import json
+from .prompt import prompt_contents, serialize_activity, serialize_batch, system_instructions, system_instructions_text
+from .fallback import fallback_post
+from .cache import PostCache, SQLitePostTier, post_cache_key
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from pydantic import ValidationError
+from pydantic_core import from_json
+import asyncio
+import telemetry
 
 class GeminiAPIClient:   
     def __init__(self, settings: GeminiSettings):
         self.gemini_api_key = settings.gemini_api_key
         self.model_name = settings.gemini_model_name
-        self.client = genai.Client(api_key=self.gemini_api_key)
-    
-    def generate_content_config(self):
+        self.prompt_max_fields = settings.gemini_prompt_max_fields
+        self.thinking_budget = settings.gemini_thinking_budget
+        self.deadline = settings.gemini_deadline
+        self.batch_size = settings.gemini_batch_size
+        self.batch_concurrency = settings.gemini_batch_concurrency
+        # Shared by every generate_posts call, so concurrent backfill
+        # consumers stay within batch_concurrency model requests in total
+        self.batch_semaphore = asyncio.Semaphore(self.batch_concurrency)
+        self.batch_deadline = settings.gemini_batch_deadline
+        http_options = types.HttpOptions(base_url=settings.gemini_base_url) if settings.gemini_base_url else None
+        self.client = genai.Client(api_key=self.gemini_api_key, http_options=http_options)
+        self.cache = PostCache(
+            maxsize=settings.gemini_cache_size,
+            ttl=settings.gemini_cache_ttl,
+            persistent=SQLitePostTier(settings.gemini_cache_path) if settings.gemini_cache_path else None,
+        )
+        # Built once per persona; the config and schema are otherwise identical
+        self._persona_configs: Dict[Tuple[Persona, bool], Tuple[types.GenerateContentConfig, str]] = {}
+        self.content_config, _ = self.persona_config(Persona())
+
+    def persona_config(self, persona: Persona, batch: bool = False) -> Tuple[types.GenerateContentConfig, str]:
+        """The content config for ``persona`` and its instructions text."""
+        entry = self._persona_configs.get((persona, batch))
+        if entry is None:
+            entry = (self.generate_content_config(persona, batch), system_instructions_text(persona))
+            self._persona_configs[persona, batch] = entry
+        return entry
+
+    def generate_content_config(self, persona: Persona = Persona(), batch: bool = False):
+        post_schema = genai.types.Schema(
+            type = genai.types.Type.OBJECT,
+            required = ["name", "description"],
+            properties = {
+                "name": genai.types.Schema(
+                    type = genai.types.Type.STRING,
+                ),
+                "description": genai.types.Schema(
+                    type = genai.types.Type.STRING,
+                ),
+            },
+        )
+        if batch:
+            # An array of posts, each tagged with the activity it belongs to
+            post_schema.required.insert(0, "activity_id")
+            post_schema.properties["activity_id"] = genai.types.Schema(
+                type = genai.types.Type.INTEGER,
+            )
+            post_schema = genai.types.Schema(
+                type = genai.types.Type.ARRAY,
+                items = post_schema,
+            )
         config = types.GenerateContentConfig(
             thinking_config = types.ThinkingConfig(
-                thinking_budget=-1,
+                thinking_budget=self.thinking_budget,
             ),
             response_mime_type="application/json",
-            response_schema=genai.types.Schema(
-                type = genai.types.Type.OBJECT,
-                required = ["name", "description"],
-                properties = {
-                    "name": genai.types.Schema(
-                        type = genai.types.Type.STRING,
-                    ),
-                    "description": genai.types.Schema(
-                        type = genai.types.Type.STRING,
-                    ),
-                },
-            ),
-            system_instruction = KLAUS_SYSTEM_INSTRUCTIONS
+            response_schema=post_schema,
+            system_instruction = system_instructions(persona, batch)
         )
         return config
 
-    def generate_post(self, activity: DetailedActivity):
-        contents = generate_prompt(activity)
-        content_config = self.generate_content_config()
-
+    async def generate_model_post(self, prompt: str, config: Optional[types.GenerateContentConfig] = None) -> GeminiPost:
         # Generate post
-        response = self.client.models.generate_content(
+        response = await self.client.aio.models.generate_content(
             model=self.model_name,
-            contents=contents,
-            config=content_config
+            contents=prompt_contents(prompt),
+            config=config or self.content_config
         )
-        
+        telemetry.record_usage(response.usage_metadata)
+
         # Send response JSON
-        response_json = json.loads(response.text)
-        return GeminiPost(**response_json)
+        return GeminiPost.model_validate_json(response.text)
+
+    async def generate_post(
+        self,
+        activity: DetailedActivity,
+        history: Optional[Dict[str, Any]] = None,
+        persona: Optional[Persona] = None,
+    ) -> GeminiPost:
+        """Generate a post, falling back to a template if the deadline passes.
+
+        Identical prompts for the same persona are served from the cache;
+        fallback posts are not cached so a later retry can still get a
+        model-written post.
+        """
+        config, instructions = self.persona_config(persona or Persona())
+        with telemetry.span("build_prompt"):
+            prompt = serialize_activity(activity, self.prompt_max_fields, history)
+        cache_key = post_cache_key(self.model_name, instructions, prompt)
+        cached_post = self.cache.get(cache_key)
+        if cached_post:
+            telemetry.record("gemini_cache_hits")
+            return cached_post
+
+        try:
+            with telemetry.span("generate"):
+                post = await asyncio.wait_for(self.generate_model_post(prompt, config), self.deadline)
+        except asyncio.TimeoutError:
+            telemetry.record("gemini_fallbacks")
+            telemetry.log(f"Gemini exceeded {self.deadline}s deadline, using fallback post", deadline=self.deadline)
+            return fallback_post(activity)
+        self.cache.set(cache_key, post)
+        return post
+
+    async def generate_model_batch(
+        self,
+        prompts: Sequence[Tuple[int, str]],
+        config: types.GenerateContentConfig,
+    ) -> Dict[int, GeminiPost]:
+        """One request for several activities; returns the well-formed posts by id.
+
+        Items that are malformed, duplicated or for an activity that was not
+        asked for are dropped, so the caller retries them.
+        """
+        response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents=prompt_contents(serialize_batch(prompts)),
+            config=config
+        )
+        telemetry.record_usage(response.usage_metadata)
+
+        wanted = {activity_id for activity_id, _ in prompts}
+        items = from_json(response.text or "[]")
+        posts: Dict[int, GeminiPost] = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                batch_post = GeminiBatchPost.model_validate(item)
+            except ValidationError:
+                continue
+            if batch_post.activity_id in wanted and batch_post.activity_id not in posts:
+                posts[batch_post.activity_id] = GeminiPost(name=batch_post.name, description=batch_post.description)
+        return posts
+
+    async def generate_posts(
+        self,
+        activities: Sequence[DetailedActivity],
+        histories: Optional[Mapping[int, Dict[str, Any]]] = None,
+        persona: Optional[Persona] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[int, GeminiPost]:
+        """Generate posts for many activities, several per model request.
+
+        Cached posts are reused and new ones cached under the same keys as
+        ``generate_post``. A batch that fails, or times out, is split in half
+        and retried; items missing from an otherwise good response are retried
+        together. Single activities go through ``generate_post`` (and its
+        fallback). Activities that still fail are left out of the result.
+        """
+        persona = persona or Persona()
+        batch_size = batch_size or self.batch_size
+        config, instructions = self.persona_config(persona, batch=True)
+        by_id = {activity.id: activity for activity in activities}
+        histories = histories or {}
+
+        posts: Dict[int, GeminiPost] = {}
+        pending: List[Tuple[int, str]] = []
+        with telemetry.span("build_prompt"):
+            for activity in by_id.values():
+                try:
+                    prompt = serialize_activity(activity, self.prompt_max_fields, histories.get(activity.id))
+                except Exception as e:
+                    telemetry.log(
+                        f"Could not build a prompt for activity {activity.id}: {type(e).__name__}: {e}",
+                        activity_id=activity.id,
+                    )
+                    continue
+                cached_post = self.cache.get(post_cache_key(self.model_name, instructions, prompt))
+                if cached_post:
+                    telemetry.record("gemini_cache_hits")
+                    posts[activity.id] = cached_post
+                else:
+                    pending.append((activity.id, prompt))
+
+        async def generate_one(activity_id: int):
+            activity = by_id[activity_id]
+            try:
+                async with self.batch_semaphore:
+                    posts[activity_id] = await self.generate_post(activity, histories.get(activity_id), persona)
+            except Exception as e:
+                telemetry.log(f"Gemini failed for activity {activity_id}: {type(e).__name__}: {e}", activity_id=activity_id)
+
+        async def generate_chunk(chunk: List[Tuple[int, str]]):
+            if len(chunk) == 1:
+                await generate_one(chunk[0][0])
+                return
+            try:
+                async with self.batch_semaphore:
+                    with telemetry.span("generate_batch"):
+                        generated = await asyncio.wait_for(self.generate_model_batch(chunk, config), self.batch_deadline)
+            except Exception as e:
+                telemetry.log(f"Gemini batch of {len(chunk)} failed, splitting: {type(e).__name__}: {e}", batch=len(chunk))
+                generated = {}
+            for activity_id, prompt in chunk:
+                if activity_id in generated:
+                    posts[activity_id] = generated[activity_id]
+                    self.cache.set(post_cache_key(self.model_name, instructions, prompt), generated[activity_id])
+            missing = [item for item in chunk if item[0] not in generated]
+            if not missing:
+                return
+            telemetry.record("gemini_batch_retries", len(missing))
+            if len(missing) < len(chunk):
+                await generate_chunk(missing)
+            else:
+                half = len(chunk) // 2
+                await asyncio.gather(generate_chunk(chunk[:half]), generate_chunk(chunk[half:]))
+
+        chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        await asyncio.gather(*(generate_chunk(chunk) for chunk in chunks))
+        return posts
+
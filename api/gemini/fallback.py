@@ -0,0 +1,39 @@
+"""
+Deterministic template posts used when the model misses its deadline.
+
+The template is picked from the activity id, so retries of the same activity
+produce the same post.
+"""
+from strava.models import DetailedActivity
+from .features import extract_activity_features
+from .models import GeminiPost
+
+NAME_TEMPLATES = [
+    "{time_of_day_title} Sniff Patrol",
+    "{distance_km} km of Pure Joy",
+    "{time_of_day_title} Zoomies",
+    "Walkies! ({distance_km} km)",
+]
+
+DESCRIPTION_TEMPLATES = [
+    "Took my human on a {distance_km} km {time_of_day} walk{location}. {minutes} minutes of sniffing and zero squirrels caught. Yet.",
+    "{distance_km} km{location} in the {time_of_day}! Smelled every tree, greeted every dog, and came home ready for a nap.",
+    "Best {time_of_day} ever: {distance_km} km in {minutes} minutes{location}. Tail wagged the entire time. Treats please.",
+    "Walked {distance_km} km{location}. I pulled, dad said heel, we compromised. {minutes} minutes well spent!",
+]
+
+
+def fallback_post(activity: DetailedActivity) -> GeminiPost:
+    features = extract_activity_features(activity)
+    time_of_day = features.get("time_of_day", "day")
+    location = features.get("location")
+    values = {
+        "distance_km": f"{features.get('distance_km', 0):g}",
+        "minutes": round(features.get("moving_time_min", 0)),
+        "time_of_day": time_of_day,
+        "time_of_day_title": time_of_day.title(),
+        "location": f" around {location.split(',')[0]}" if location else "",
+    }
+    name = NAME_TEMPLATES[activity.id % len(NAME_TEMPLATES)].format(**values)
+    description = DESCRIPTION_TEMPLATES[activity.id % len(DESCRIPTION_TEMPLATES)].format(**values)
+    return GeminiPost(name=name, description=description)
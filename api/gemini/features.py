@@ -0,0 +1,116 @@
+"""
+Reduce a DetailedActivity to the small set of facts the persona uses.
+
+Fields are listed in priority order; ``max_fields`` keeps the first N that
+have a value, so the payload stays small and stable across activities.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from strava.models import DetailedActivity
+from strava.polyline import RouteMetrics, polyline_route_metrics
+
+DEFAULT_MAX_FIELDS = 20
+
+
+def _time_of_day(hour: int) -> str:
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 21:
+        return "evening"
+    return "night"
+
+
+def _pace_min_per_km(activity: DetailedActivity) -> Optional[float]:
+    if not activity.distance or not activity.moving_time:
+        return None
+    return round(activity.moving_time / 60 / (activity.distance / 1000), 2)
+
+
+def _location(activity: DetailedActivity) -> Optional[str]:
+    parts = [activity.location_city, activity.location_state]
+    location = ", ".join(part for part in parts if part)
+    return location or None
+
+
+def _records(activity: DetailedActivity) -> Optional[List[str]]:
+    efforts = activity.best_efforts or []
+    records = [f"{effort.name} in {effort.elapsed_time // 60}:{effort.elapsed_time % 60:02d}" for effort in efforts[:3]]
+    return records or None
+
+
+def _fastest_split_km(activity: DetailedActivity) -> Optional[int]:
+    splits = [split for split in activity.splits_metric or [] if split.average_speed]
+    if len(splits) < 2:
+        return None
+    return max(splits, key=lambda split: split.average_speed).split
+
+
+def _route(activity: DetailedActivity) -> Optional[RouteMetrics]:
+    polyline = activity.map.polyline or activity.map.summary_polyline
+    if not polyline:
+        return None
+    try:
+        return polyline_route_metrics(polyline)
+    except ValueError:
+        # Route facts are optional; a corrupt polyline must not sink the post
+        return None
+
+
+def _route_fact(name: str) -> Callable[[DetailedActivity], Any]:
+    def extract(activity: DetailedActivity) -> Any:
+        route = _route(activity)
+        return getattr(route, name) if route else None
+    return extract
+
+
+def _farthest_from_start(activity: DetailedActivity) -> Optional[int]:
+    route = _route(activity)
+    return round(route.max_distance_from_home_m) if route else None
+
+
+def _rounded_latlng(latlng: Optional[List[float]]) -> Optional[List[float]]:
+    return [round(value, 3) for value in latlng] if latlng else None
+
+
+FEATURES: List[Tuple[str, Callable[[DetailedActivity], Any]]] = [
+    ("name", lambda a: a.name),
+    ("sport_type", lambda a: a.sport_type),
+    ("distance_km", lambda a: round(a.distance / 1000, 2)),
+    ("moving_time_min", lambda a: round(a.moving_time / 60, 1)),
+    ("elapsed_time_min", lambda a: round(a.elapsed_time / 60, 1)),
+    ("pace_min_per_km", _pace_min_per_km),
+    ("start_time_local", lambda a: a.start_date_local.strftime("%H:%M")),
+    ("time_of_day", lambda a: _time_of_day(a.start_date_local.hour)),
+    ("weekday", lambda a: a.start_date_local.strftime("%A")),
+    ("location", _location),
+    ("elevation_gain_m", lambda a: round(a.total_elevation_gain)),
+    ("route_shape", _route_fact("shape")),
+    ("farthest_from_start_m", _farthest_from_start),
+    ("description", lambda a: a.description),
+    ("records", _records),
+    ("pr_count", lambda a: a.pr_count),
+    ("achievement_count", lambda a: a.achievement_count),
+    ("max_speed_kmh", lambda a: round(a.max_speed * 3.6, 1)),
+    ("fastest_split_km", _fastest_split_km),
+    ("turn_count", _route_fact("turn_count")),
+    ("average_heartrate", lambda a: round(a.average_heartrate) if a.average_heartrate else None),
+    ("average_temp_c", lambda a: a.average_temp),
+    ("elev_high_m", lambda a: round(a.elev_high) if a.elev_high is not None else None),
+    ("start_latlng", lambda a: _rounded_latlng(a.start_latlng)),
+    ("kudos_count", lambda a: a.kudos_count),
+    ("photo_count", lambda a: a.total_photo_count),
+]
+
+
+def extract_activity_features(activity: DetailedActivity, max_fields: int = DEFAULT_MAX_FIELDS) -> Dict[str, Any]:
+    """Compact, prompt-ready facts about ``activity``; empty values are dropped."""
+    features: Dict[str, Any] = {}
+    for name, extract in FEATURES:
+        if len(features) >= max_fields:
+            break
+        value = extract(activity)
+        if value is None or value == "" or (value == 0 and name.endswith("_count")):
+            continue
+        features[name] = value
+    return features
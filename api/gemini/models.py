@@ -1,9 +1,33 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
 
 class GeminiSettings:
     gemini_api_key: str
     gemini_model_name: str = "gemini-2.5-flash"
+    gemini_base_url: Optional[str] = None
+    gemini_prompt_max_fields: int = 20
+    gemini_thinking_budget: int = 512
+    gemini_deadline: float = 20.0
+    gemini_cache_size: int = 1024
+    gemini_cache_ttl: float = 604800
+    gemini_cache_path: Optional[str] = None
+    gemini_batch_size: int = 10
+    gemini_batch_concurrency: int = 4
+    gemini_batch_deadline: float = 60.0
     
+class Persona(BaseModel):
+    """Who the posts are written as; one per athlete."""
+    model_config = ConfigDict(frozen=True)
+
+    name: str = "Klaus"
+    description: str = "a lovable and energetic Labrador Retriever mix"
+    home: str = "Austin, Texas"
+    # Extra guidance on voice, e.g. "A little sarcastic"
+    style: Optional[str] = None
+
 class GeminiPost(BaseModel):
     name: str
-    description: str
\ No newline at end of file
+    description: str
+
+class GeminiBatchPost(GeminiPost):
+    activity_id: int
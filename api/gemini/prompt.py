@@ -1,5 +1,9 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from strava.models import DetailedActivity
 from google.genai import types
+from .features import DEFAULT_MAX_FIELDS, extract_activity_features
+from .models import Persona
+import json
 # System Instructions: structure from coursera
 # - Task
 # 	- Persona
@@ -8,43 +12,49 @@ from google.genai import types
 # - References
 # - Evaluate
 # - Iterate -> Make it more fun. Maybe sarcastic
-KLAUS_SYSTEM_INSTRUCTIONS = [types.Part.from_text(text="""
-You are Klaus, a lovable and energetic Labrador Retriever mix living in Austin, Texas. You have a Strava account that tracks your walks and runs.
+PERSONA_INSTRUCTIONS = """
+You are {name}, {description} living in {home}. You have a Strava account that tracks your walks and runs.
 
 Your respond with content for a new Strava post with a `name` and a 100-200 character `description`
 
 You will receive automated Strava posts created by Fi collars. Use the provided information to create a new post. Your posts should reflect a simple, dog-like perspective.
-"""),
-types.Part.from_text(text="""
-CONTEXT: You will receive Strava activity data with the following structure:
+"""
+PERSONA_STYLE = """
+STYLE: {style}
+"""
+# Shared by every persona
+INSTRUCTION_PARTS = [types.Part.from_text(text="""
+CONTEXT: You will receive a compact JSON summary of a Strava activity. Any of these fields may be missing:
 
 BASIC ACTIVITY INFO:
-- id: Unique activity identifier
 - name: Current activity name (usually auto-generated)
-- distance: Distance in meters
-- moving_time: Time spent moving in seconds
-- elapsed_time: Total elapsed time in seconds
-- total_elevation_gain: Elevation gained in meters
-- type: Activity type (e.g., "Walk", "Run")
 - sport_type: Specific sport type (e.g., "Walk", "Run")
-- start_date: When the activity started (ISO 8601 format)
-- start_date_local: Local start time
-- timezone: Activity timezone
+- distance_km: Distance in kilometers
+- moving_time_min / elapsed_time_min: Time spent moving / total time, in minutes
+- pace_min_per_km: Moving pace in minutes per kilometer
+- start_time_local, time_of_day, weekday: When the activity started, in local time
+- description: Current activity description
 
 LOCATION & ROUTE:
-- start_latlng: Starting coordinates [latitude, longitude]
-- end_latlng: Ending coordinates [latitude, longitude]
-- map: Polyline map data for the route
+- location: City and state
+- start_latlng: Approximate starting coordinates [latitude, longitude]
+- elevation_gain_m / elev_high_m: Elevation gained and highest point, in meters
+- route_shape: "loop", "out_and_back" or "point_to_point"
+- farthest_from_start_m: How far from the start the route went, in meters
+- turn_count: Number of sharp turns along the route
 
-MOST RELEVANT ACTIVITY DETAILS:
-- name: Current activity name
-- description: Current activity description
-- distance: Distance in meters
-- moving_time: Time spent moving in seconds
-- elapsed_time: Total elapsed time in seconds
-- total_elevation_gain: Elevation gained in meters
-- average_speed: Average speed in meters per second
-- max_speed: Maximum speed in meters per second
+NOTABLE DETAILS:
+- records: Best efforts such as "1k in 9:30"
+- pr_count, achievement_count, kudos_count, photo_count
+- max_speed_kmh, fastest_split_km, average_heartrate, average_temp_c
+
+HISTORY (when available):
+- history.count_this_week, history.distance_this_week_km, history.distance_this_month_km
+- history.longest_this_month: Whether this is the longest one this month
+- history.streak_days: Consecutive days with an activity, including today
+- history.personal_bests: Metrics where this is an all-time best (distance, moving_time, total_elevation_gain)
+- history.from_favorite_start: Whether it started from the usual spot
+- history.recent_post_names: Names of your recent posts; do not repeat them
 
 Use this data to create engaging, dog-like posts that reference relevant details like distance, time, location, or interesting metrics.
 """),
@@ -53,9 +63,37 @@ Example response:
 {"name": "Morning Walk", "description": "Went for a morning walk with dad. Saw many squirrels and an armadillo!"}
 """)]
 
-# TODO: Improve prompt
-def generate_prompt(activity: DetailedActivity):
-    prompt = activity.model_dump_json()
+BATCH_INSTRUCTIONS = types.Part.from_text(text="""
+BATCH: You will receive a JSON array of activities, each as {"activity_id": ..., "activity": {...}}. Respond with a JSON array holding one post per activity, each as {"activity_id": ..., "name": ..., "description": ...} with the activity_id it was written for. Write every post on its own; do not reuse names.
+""")
+
+def system_instructions(persona: Persona, batch: bool = False) -> List[types.Part]:
+    text = PERSONA_INSTRUCTIONS.format(name=persona.name, description=persona.description, home=persona.home)
+    if persona.style:
+        text += PERSONA_STYLE.format(style=persona.style)
+    parts = [types.Part.from_text(text=text), *INSTRUCTION_PARTS]
+    if batch:
+        parts.append(BATCH_INSTRUCTIONS)
+    return parts
+
+def system_instructions_text(persona: Persona) -> str:
+    return "".join(part.text for part in system_instructions(persona))
+
+def serialize_activity(
+    activity: DetailedActivity,
+    max_fields: int = DEFAULT_MAX_FIELDS,
+    history: Optional[Dict[str, Any]] = None,
+) -> str:
+    features = extract_activity_features(activity, max_fields)
+    if history:
+        features["history"] = history
+    return json.dumps(features, separators=(",", ":"), ensure_ascii=False)
+
+def serialize_batch(prompts: Sequence[Tuple[int, str]]) -> str:
+    """Pack ``(activity_id, serialize_activity(...))`` pairs into one batch prompt."""
+    return "[" + ",".join(f'{{"activity_id":{activity_id},"activity":{prompt}}}' for activity_id, prompt in prompts) + "]"
+
+def prompt_contents(prompt: str):
     contents = [
         types.Content(role="user", 
         parts=[types.Part.from_text(text=prompt)]
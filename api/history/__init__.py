@@ -0,0 +1,7 @@
+"""
+Local history of activities and generated posts, used to give the model
+context beyond the single activity it is captioning.
+"""
+from .store import ActivityStore
+
+__all__ = ["ActivityStore"]
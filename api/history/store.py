@@ -0,0 +1,364 @@
+"""
+Embedded SQLite store of past activities and generated posts.
+
+Rolling aggregates (weekly/monthly totals, streaks, personal bests, start
+areas) are updated on insert, each with a single keyed upsert, so building
+prompt context for a new activity never scans history or calls Strava.
+Activities older than the newest stored one (backfill) get their context
+from queries scoped to their start date instead.
+"""
+import sqlite3
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from strava.models import DetailedActivity, SummaryActivity
+from strava.ratelimit import PRIORITY_BACKFILL
+
+if TYPE_CHECKING:
+    from strava import StravaAPIClient
+    from gemini.models import GeminiPost
+
+Activity = Union[DetailedActivity, SummaryActivity]
+
+# ~500 m grid cells for "favorite start area"
+START_AREA_DEGREES = 0.005
+
+PERSONAL_BEST_METRICS = ["distance", "moving_time", "total_elevation_gain"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY,
+    athlete_id INTEGER NOT NULL,
+    sport_type TEXT NOT NULL,
+    start_date INTEGER NOT NULL,
+    start_date_local TEXT NOT NULL,
+    name TEXT NOT NULL,
+    distance REAL NOT NULL,
+    moving_time INTEGER NOT NULL,
+    elapsed_time INTEGER NOT NULL,
+    total_elevation_gain REAL,
+    start_lat REAL,
+    start_lng REAL
+);
+CREATE INDEX IF NOT EXISTS activities_athlete_date ON activities (athlete_id, start_date);
+CREATE INDEX IF NOT EXISTS activities_athlete_sport_date ON activities (athlete_id, sport_type, start_date);
+CREATE TABLE IF NOT EXISTS posts (
+    activity_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS period_totals (
+    athlete_id INTEGER NOT NULL,
+    sport_type TEXT NOT NULL,
+    period TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    longest_distance REAL NOT NULL,
+    PRIMARY KEY (athlete_id, sport_type, period)
+);
+CREATE TABLE IF NOT EXISTS streaks (
+    athlete_id INTEGER PRIMARY KEY,
+    last_day INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    best INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS personal_bests (
+    athlete_id INTEGER NOT NULL,
+    sport_type TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    activity_id INTEGER NOT NULL,
+    PRIMARY KEY (athlete_id, sport_type, metric)
+);
+CREATE TABLE IF NOT EXISTS start_areas (
+    athlete_id INTEGER NOT NULL,
+    area TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (athlete_id, area)
+);
+CREATE INDEX IF NOT EXISTS start_areas_count ON start_areas (athlete_id, count);
+CREATE TABLE IF NOT EXISTS sync_state (
+    athlete_id INTEGER PRIMARY KEY,
+    after INTEGER NOT NULL
+);
+"""
+
+
+def _periods(day: date) -> List[str]:
+    year, week, _ = day.isocalendar()
+    return [f"week:{year}-W{week:02d}", f"month:{day.year}-{day.month:02d}"]
+
+
+def _start_area_of(lat: float, lng: float) -> str:
+    return f"{round(lat / START_AREA_DEGREES)}:{round(lng / START_AREA_DEGREES)}"
+
+
+def _start_area(activity: Activity) -> Optional[str]:
+    if not activity.start_latlng:
+        return None
+    return _start_area_of(*activity.start_latlng[:2])
+
+
+def _add_totals(context: Dict[str, Any], activity: Activity, week: Optional[Tuple], month: Optional[Tuple]):
+    """Add week and month ``(count, distance, longest_distance)`` totals."""
+    if week:
+        context["count_this_week"] = week[0]
+        context["distance_this_week_km"] = round(week[1] / 1000, 1)
+    if month:
+        context["distance_this_month_km"] = round(month[1] / 1000, 1)
+        context["longest_this_month"] = month[0] > 1 and activity.distance >= month[2]
+
+
+def _athlete_id(activity: Activity, athlete_id: Optional[int]) -> int:
+    if athlete_id is not None:
+        return athlete_id
+    if activity.athlete is None:
+        raise ValueError(f"Activity {activity.id} has no athlete; pass athlete_id")
+    return activity.athlete.id
+
+
+class ActivityStore:
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+
+    def add_activity(self, activity: Activity, athlete_id: Optional[int] = None) -> bool:
+        """Insert ``activity`` and fold it into the aggregates.
+
+        Returns False if it was already stored; aggregates are untouched then,
+        so re-syncing never double counts.
+        """
+        with self._conn:
+            return self._insert(activity, _athlete_id(activity, athlete_id))
+
+    def _insert(self, activity: Activity, athlete_id: int) -> bool:
+        local_day = activity.start_date_local.date()
+        start_latlng = activity.start_latlng or [None, None]
+        inserted = self._conn.execute(
+            "INSERT OR IGNORE INTO activities (id, athlete_id, sport_type, start_date, start_date_local, "
+            "name, distance, moving_time, elapsed_time, total_elevation_gain, start_lat, start_lng) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                activity.id, athlete_id, activity.sport_type, int(activity.start_date.timestamp()),
+                activity.start_date_local.isoformat(), activity.name, activity.distance,
+                activity.moving_time, activity.elapsed_time, activity.total_elevation_gain,
+                start_latlng[0], start_latlng[1],
+            )
+        ).rowcount
+        if not inserted:
+            return False
+
+        for period in _periods(local_day):
+            self._conn.execute(
+                "INSERT INTO period_totals (athlete_id, sport_type, period, count, distance, longest_distance) "
+                "VALUES (?, ?, ?, 1, ?, ?) ON CONFLICT (athlete_id, sport_type, period) DO UPDATE SET count = count + 1, "
+                "distance = distance + excluded.distance, "
+                "longest_distance = MAX(longest_distance, excluded.longest_distance)",
+                (athlete_id, activity.sport_type, period, activity.distance, activity.distance)
+            )
+
+        day = local_day.toordinal()
+        self._conn.execute(
+            "INSERT INTO streaks (athlete_id, last_day, current, best) VALUES (?, ?, 1, 1) "
+            "ON CONFLICT (athlete_id) DO UPDATE SET "
+            "current = CASE WHEN excluded.last_day = last_day + 1 THEN current + 1 "
+            "WHEN excluded.last_day > last_day + 1 THEN 1 ELSE current END, "
+            "best = MAX(best, CASE WHEN excluded.last_day = last_day + 1 THEN current + 1 ELSE 1 END), "
+            "last_day = MAX(last_day, excluded.last_day)",
+            (athlete_id, day)
+        )
+        last_day, current = self._conn.execute(
+            "SELECT last_day, current FROM streaks WHERE athlete_id = ?", (athlete_id,)
+        ).fetchone()
+        if day == last_day - current:
+            # An older day just before the current run (backfill walks newest
+            # first) extends it, possibly joining the run stored before it
+            extended = current + 1 + self._run_before(athlete_id, int(activity.start_date.timestamp()), day)
+            self._conn.execute(
+                "UPDATE streaks SET current = ?, best = MAX(best, ?) WHERE athlete_id = ?",
+                (extended, extended, athlete_id)
+            )
+
+        for metric in PERSONAL_BEST_METRICS:
+            value = getattr(activity, metric)
+            if value is None:
+                continue
+            self._conn.execute(
+                "INSERT INTO personal_bests (athlete_id, sport_type, metric, value, activity_id) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (athlete_id, sport_type, metric) DO UPDATE SET "
+                "value = excluded.value, activity_id = excluded.activity_id WHERE excluded.value > value "
+                # On a tie the earlier activity set the record, whatever the insert order
+                "OR (excluded.value = value AND ? < (SELECT start_date FROM activities WHERE id = personal_bests.activity_id))",
+                (athlete_id, activity.sport_type, metric, value, activity.id, int(activity.start_date.timestamp()))
+            )
+
+        area = _start_area(activity)
+        if area:
+            self._conn.execute(
+                "INSERT INTO start_areas (athlete_id, area, count) VALUES (?, ?, 1) "
+                "ON CONFLICT (athlete_id, area) DO UPDATE SET count = count + 1",
+                (athlete_id, area)
+            )
+        return True
+
+    def _run_before(self, athlete_id: int, started: int, day: int) -> int:
+        """Consecutive days with an activity ending the day before ``day``."""
+        run, expected = 0, day - 1
+        for (local,) in self._conn.execute(
+            "SELECT start_date_local FROM activities WHERE athlete_id = ? AND start_date < ? "
+            "ORDER BY start_date DESC",
+            (athlete_id, started)
+        ):
+            earlier = date.fromisoformat(local[:10]).toordinal()
+            if earlier == expected:
+                run, expected = run + 1, earlier - 1
+            elif earlier < expected:
+                break
+        return run
+
+    def add_post(self, activity_id: int, post: "GeminiPost"):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (activity_id, name, description, created_at) VALUES (?, ?, ?, ?)",
+                (activity_id, post.name, post.description, time.time())
+            )
+
+    def context(self, activity: Activity, athlete_id: Optional[int] = None, recent_posts: int = 3) -> Dict[str, Any]:
+        """Historical facts about ``activity`` for the prompt, as of its start.
+
+        The aggregates describe history up to the newest stored activity, so
+        they answer for that one. Older activities (backfill walks newest
+        first) are answered from the activities table, scoped to what came
+        before them, so their facts never include later walks.
+        """
+        athlete_id = _athlete_id(activity, athlete_id)
+        started = int(activity.start_date.timestamp())
+        (latest,) = self._conn.execute(
+            "SELECT MAX(start_date) FROM activities WHERE athlete_id = ?", (athlete_id,)
+        ).fetchone()
+        if latest is not None and latest > started:
+            context = self._context_as_of(activity, athlete_id, started)
+        else:
+            context = self._aggregate_context(activity, athlete_id)
+
+        names = [
+            name for (name,) in self._conn.execute(
+                "SELECT posts.name FROM posts JOIN activities ON activities.id = posts.activity_id "
+                "WHERE activities.athlete_id = ? AND activities.start_date <= ? AND posts.activity_id != ? "
+                "ORDER BY activities.start_date DESC LIMIT ?",
+                (athlete_id, started, activity.id, recent_posts)
+            )
+        ]
+        if names:
+            context["recent_post_names"] = names
+        return context
+
+    def preview_context(self, activity: Activity, athlete_id: Optional[int] = None) -> Dict[str, Any]:
+        """``context`` as if ``activity`` were stored, leaving the store untouched."""
+        athlete_id = _athlete_id(activity, athlete_id)
+        try:
+            self._insert(activity, athlete_id)
+            return self.context(activity, athlete_id)
+        finally:
+            self._conn.rollback()
+
+    def _aggregate_context(self, activity: Activity, athlete_id: int) -> Dict[str, Any]:
+        week, month = _periods(activity.start_date_local.date())
+        context: Dict[str, Any] = {}
+
+        totals = dict(
+            (row[0], row[1:]) for row in self._conn.execute(
+                "SELECT period, count, distance, longest_distance FROM period_totals "
+                "WHERE athlete_id = ? AND sport_type = ? AND period IN (?, ?)",
+                (athlete_id, activity.sport_type, week, month)
+            )
+        )
+        _add_totals(context, activity, totals.get(week), totals.get(month))
+
+        streak = self._conn.execute(
+            "SELECT last_day, current, best FROM streaks WHERE athlete_id = ?", (athlete_id,)
+        ).fetchone()
+        if streak and streak[0] == activity.start_date_local.date().toordinal() and streak[1] > 1:
+            context["streak_days"] = streak[1]
+
+        personal_bests = [
+            metric for (metric,) in self._conn.execute(
+                "SELECT metric FROM personal_bests WHERE athlete_id = ? AND sport_type = ? AND activity_id = ?",
+                (athlete_id, activity.sport_type, activity.id)
+            )
+        ]
+        if personal_bests:
+            context["personal_bests"] = personal_bests
+
+        favorite = self._conn.execute(
+            "SELECT area FROM start_areas WHERE athlete_id = ? ORDER BY count DESC LIMIT 1", (athlete_id,)
+        ).fetchone()
+        area = _start_area(activity)
+        if favorite and area:
+            context["from_favorite_start"] = favorite[0] == area
+        return context
+
+    def _context_as_of(self, activity: Activity, athlete_id: int, started: int) -> Dict[str, Any]:
+        day = activity.start_date_local.date()
+        context: Dict[str, Any] = {}
+
+        def period_totals(first_day: date) -> Optional[Tuple[int, float, float]]:
+            # The start_date bound keeps the scan on the (athlete, sport, date) index
+            count, distance, longest = self._conn.execute(
+                "SELECT COUNT(*), SUM(distance), MAX(distance) FROM activities "
+                "WHERE athlete_id = ? AND sport_type = ? AND start_date BETWEEN ? AND ? AND start_date_local >= ?",
+                (athlete_id, activity.sport_type, started - 32 * 86400, started, first_day.isoformat())
+            ).fetchone()
+            return (count, distance, longest) if count else None
+
+        _add_totals(
+            context,
+            activity,
+            period_totals(day - timedelta(days=day.weekday())),
+            period_totals(day.replace(day=1)),
+        )
+
+        streak = 1 + self._run_before(athlete_id, started, day.toordinal())
+        if streak > 1:
+            context["streak_days"] = streak
+
+        previous_bests = self._conn.execute(
+            f"SELECT {', '.join(f'MAX({metric})' for metric in PERSONAL_BEST_METRICS)} FROM activities "
+            "WHERE athlete_id = ? AND sport_type = ? AND start_date <= ? AND id != ?",
+            (athlete_id, activity.sport_type, started, activity.id)
+        ).fetchone()
+        personal_bests = [
+            metric for metric, best in zip(PERSONAL_BEST_METRICS, previous_bests)
+            if getattr(activity, metric) is not None and (best is None or getattr(activity, metric) > best)
+        ]
+        if personal_bests:
+            context["personal_bests"] = personal_bests
+
+        area = _start_area(activity)
+        if area:
+            areas = Counter(
+                _start_area_of(lat, lng) for lat, lng in self._conn.execute(
+                    "SELECT start_lat, start_lng FROM activities "
+                    "WHERE athlete_id = ? AND start_date <= ? AND start_lat IS NOT NULL",
+                    (athlete_id, started)
+                )
+            )
+            if areas:
+                context["from_favorite_start"] = areas.most_common(1)[0][0] == area
+        return context
+
+    async def sync(self, strava_client: "StravaAPIClient", athlete_id: int, priority: int = PRIORITY_BACKFILL) -> int:
+        """Fetch activities newer than the stored cursor; returns how many were added."""
+        row = self._conn.execute("SELECT after FROM sync_state WHERE athlete_id = ?", (athlete_id,)).fetchone()
+        after = row[0] if row else 0
+        added = 0
+        async for activity in strava_client.iter_activities(after=after, priority=priority):
+            added += self.add_activity(activity, athlete_id)
+            after = max(after, int(activity.start_date.timestamp()))
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (athlete_id, after) VALUES (?, ?)", (athlete_id, after)
+                )
+        return added
@@ -0,0 +1,28 @@
+"""
+Background processing of Strava webhook events.
+
+The webhook endpoint enqueues events and returns immediately; a worker pool
+drains the queue, retrying failures with backoff and dead-lettering the rest.
+On Lambda, events are handed to an asynchronous self-invocation instead.
+"""
+from .dedup import DedupStore, SQLiteDedupTier, event_key
+from .invoke import LAMBDA_JOB_KEY, LambdaInvoker
+from .models import Job, JobDispatchError, JobQueueFull
+from .queue import AsyncioJobQueue, SQLiteJobQueue, JobQueue, build_job_queue
+from .worker import WorkerPool
+
+__all__ = [
+    "AsyncioJobQueue",
+    "DedupStore",
+    "Job",
+    "JobDispatchError",
+    "JobQueue",
+    "JobQueueFull",
+    "LAMBDA_JOB_KEY",
+    "LambdaInvoker",
+    "SQLiteDedupTier",
+    "SQLiteJobQueue",
+    "WorkerPool",
+    "build_job_queue",
+    "event_key",
+]
@@ -0,0 +1,109 @@
+"""
+Idempotency for webhook events.
+
+Strava redelivers events, so a ``create`` can arrive more than once. Keys
+are ``object_id:aspect_type``; an in-memory LRU answers in O(1), with an
+optional SQLite tier so dedup survives process recycling.
+"""
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from strava.models import StravaWebhookEvent
+
+IN_PROGRESS = "in_progress"
+PROCESSED = "processed"
+
+
+def event_key(event: StravaWebhookEvent) -> str:
+    return f"{event.object_id}:{event.aspect_type}"
+
+
+class SQLiteDedupTier:
+    """Persistent dedup entries in a local SQLite file."""
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dedup ("
+            "key TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM dedup WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            "SELECT state, expires_at FROM dedup WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, state: str, expires_at: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dedup (key, state, expires_at) VALUES (?, ?, ?)",
+            (key, state, expires_at)
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn.execute("DELETE FROM dedup WHERE key = ?", (key,))
+
+
+class DedupStore:
+    """Records in-progress and processed event keys with TTL eviction.
+
+    ``lease`` bounds how long an in-progress claim blocks redeliveries, so a
+    crashed worker does not suppress an event forever.
+    """
+    def __init__(
+        self,
+        ttl: float = 86400,
+        lease: float = 900,
+        maxsize: int = 10000,
+        persistent: Optional[SQLiteDedupTier] = None,
+    ):
+        self.ttl = ttl
+        self.lease = lease
+        self.maxsize = maxsize
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None and self.persistent:
+            entry = self.persistent.get(key)
+            if entry:
+                self._remember(key, *entry)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at <= time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return state
+
+    def _remember(self, key: str, state: str, expires_at: float):
+        self._entries[key] = (state, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _set(self, key: str, state: str, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, state, expires_at)
+        if self.persistent:
+            self.persistent.set(key, state, expires_at)
+
+    def claim(self, key: str) -> bool:
+        """Mark ``key`` in progress. False if it is a duplicate."""
+        if self._get(key):
+            return False
+        self._set(key, IN_PROGRESS, self.lease)
+        return True
+
+    def complete(self, key: str):
+        self._set(key, PROCESSED, self.ttl)
+
+    def release(self, key: str):
+        """Forget a claim so a redelivery can be processed."""
+        self._entries.pop(key, None)
+        if self.persistent:
+            self.persistent.delete(key)
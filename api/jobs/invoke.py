@@ -0,0 +1,40 @@
+"""
+Hand jobs to a separate asynchronous invocation of this Lambda function.
+
+Lambda freezes the process between invocations, so a job queued in memory
+would only run while a later webhook invocation happens to be executing. The
+webhook invocation instead re-invokes the function with the job
+(``InvocationType="Event"``): Lambda queues it, runs it to completion in its
+own invocation and retries it if it fails.
+"""
+import asyncio
+import json
+from typing import Any
+from .models import Job, JobDispatchError
+
+LAMBDA_JOB_KEY = "klaus_job"
+
+
+class LambdaInvoker:
+    def __init__(self, function_name: str, client: Any = None):
+        self.function_name = function_name
+        self.client = client
+
+    def _lambda_client(self):
+        if self.client is None:
+            # boto3 ships with the Lambda Python runtime and is not bundled
+            import boto3
+            self.client = boto3.client("lambda")
+        return self.client
+
+    async def put(self, job: Job) -> None:
+        payload = json.dumps({LAMBDA_JOB_KEY: job.model_dump(mode="json")}).encode()
+        try:
+            await asyncio.to_thread(
+                self._lambda_client().invoke,
+                FunctionName=self.function_name,
+                InvocationType="Event",
+                Payload=payload,
+            )
+        except Exception as e:
+            raise JobDispatchError(f"Could not invoke {self.function_name}: {type(e).__name__}: {e}") from e
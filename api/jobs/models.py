@@ -0,0 +1,22 @@
+from typing import Optional
+import time
+import uuid
+from pydantic import BaseModel, Field
+from strava.models import StravaWebhookEvent
+
+
+class JobDispatchError(Exception):
+    """Raised when a job cannot be handed off for processing."""
+
+
+class JobQueueFull(JobDispatchError):
+    """Raised when a bounded queue cannot accept another job."""
+
+
+class Job(BaseModel):
+    """A webhook event waiting to be processed."""
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex, description="Unique job identifier")
+    event: StravaWebhookEvent = Field(..., description="The webhook event to process")
+    attempts: int = Field(0, description="Number of failed processing attempts so far")
+    available_at: float = Field(default_factory=time.time, description="Epoch seconds before which the job is not run")
+    last_error: Optional[str] = Field(None, description="Error from the most recent failed attempt")
@@ -0,0 +1,145 @@
+"""
+Job queue backends.
+
+``AsyncioJobQueue`` keeps jobs in process memory. ``SQLiteJobQueue`` persists
+them so pending and retrying jobs survive a process restart.
+"""
+import asyncio
+import sqlite3
+import time
+from collections import deque
+from typing import Deque, List, Optional, Protocol
+from .models import Job, JobQueueFull
+
+
+class JobQueue(Protocol):
+    async def put(self, job: Job) -> None: ...
+    async def get(self) -> Job: ...
+    async def ack(self, job: Job) -> None: ...
+    async def retry(self, job: Job, delay: float) -> None: ...
+    async def dead_letter(self, job: Job) -> None: ...
+    def dead_letters(self) -> List[Job]: ...
+    def size(self) -> int: ...
+
+
+class AsyncioJobQueue:
+    """Bounded in-process queue with a capped dead-letter list."""
+    def __init__(self, maxsize: int = 1000, dead_letter_size: int = 100):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._dead_letters: Deque[Job] = deque(maxlen=dead_letter_size)
+        self._scheduled_retries = 0
+
+    async def put(self, job: Job) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs)")
+
+    async def get(self) -> Job:
+        return await self._queue.get()
+
+    async def ack(self, job: Job) -> None:
+        self._queue.task_done()
+
+    async def retry(self, job: Job, delay: float) -> None:
+        self._queue.task_done()
+        job.available_at = time.time() + delay
+        self._scheduled_retries += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, job, delay)
+
+    def _requeue(self, job: Job, delay: float):
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            # Fresh jobs filled the queue meanwhile; try again rather than drop it
+            job.available_at = time.time() + delay
+            asyncio.get_running_loop().call_later(delay, self._requeue, job, delay)
+            return
+        self._scheduled_retries -= 1
+
+    async def dead_letter(self, job: Job) -> None:
+        self._queue.task_done()
+        self._dead_letters.append(job)
+
+    def dead_letters(self) -> List[Job]:
+        return list(self._dead_letters)
+
+    def size(self) -> int:
+        return self._queue.qsize() + self._scheduled_retries
+
+
+class SQLiteJobQueue:
+    """Durable queue backed by a local SQLite file.
+
+    Workers poll for due jobs; ``put`` wakes them immediately. Jobs left
+    ``running`` by a crashed process are made pending again on open.
+    """
+    def __init__(self, path: str, maxsize: int = 1000, poll_interval: float = 1.0):
+        self.path = path
+        self.maxsize = maxsize
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL, available_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, available_at)")
+        self._conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+
+    def _save(self, job: Job, status: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, payload, status, available_at) VALUES (?, ?, ?, ?)",
+            (job.id, job.model_dump_json(), status, job.available_at)
+        )
+
+    def _claim(self) -> Optional[Job]:
+        row = self._conn.execute(
+            "UPDATE jobs SET status = 'running' WHERE id = ("
+            "SELECT id FROM jobs WHERE status = 'pending' AND available_at <= ? "
+            "ORDER BY available_at LIMIT 1) RETURNING payload",
+            (time.time(),)
+        ).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    async def put(self, job: Job) -> None:
+        if self.size() >= self.maxsize:
+            raise JobQueueFull(f"Job queue is full ({self.maxsize} jobs)")
+        self._save(job, "pending")
+        self._wakeup.set()
+
+    async def get(self) -> Job:
+        while True:
+            job = self._claim()
+            if job:
+                return job
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def ack(self, job: Job) -> None:
+        self._conn.execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+
+    async def retry(self, job: Job, delay: float) -> None:
+        job.available_at = time.time() + delay
+        self._save(job, "pending")
+
+    async def dead_letter(self, job: Job) -> None:
+        self._save(job, "dead")
+
+    def dead_letters(self) -> List[Job]:
+        rows = self._conn.execute("SELECT payload FROM jobs WHERE status = 'dead'").fetchall()
+        return [Job.model_validate_json(row[0]) for row in rows]
+
+    def size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status != 'dead'").fetchone()[0]
+
+
+def build_job_queue(backend: str, path: str, maxsize: int) -> JobQueue:
+    """Build the queue selected by ``webhook_queue_backend``."""
+    if backend == "sqlite":
+        return SQLiteJobQueue(path, maxsize=maxsize)
+    return AsyncioJobQueue(maxsize=maxsize)
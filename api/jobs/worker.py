@@ -0,0 +1,83 @@
+import asyncio
+import traceback
+import telemetry
+from typing import Awaitable, Callable, List
+from strava.models import StravaWebhookEvent
+from .models import Job
+from .queue import JobQueue
+
+EventHandler = Callable[[StravaWebhookEvent], Awaitable[None]]
+
+
+class WorkerPool:
+    """Drains a job queue with bounded concurrency, retries and dead-lettering."""
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: EventHandler,
+        concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        retry_backoff_max: float = 300.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._tasks: List[asyncio.Task] = []
+        self.in_flight = 0
+
+    @property
+    def is_running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def ensure_started(self):
+        """Start the workers on the running loop if they are not already up."""
+        if self.is_running:
+            return
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain(self, poll_interval: float = 0.05):
+        """Wait until the queue is empty and no job is being processed."""
+        while self.queue.size() or self.in_flight:
+            await asyncio.sleep(poll_interval)
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.retry_backoff * 2 ** (attempts - 1), self.retry_backoff_max)
+
+    async def _run(self, job: Job):
+        try:
+            await self.handler(job.event)
+        except Exception as e:
+            job.attempts += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            if job.attempts >= self.max_attempts:
+                telemetry.log(
+                    f"Job {job.id} dead-lettered after {job.attempts} attempts: {job.last_error}",
+                    job_id=job.id,
+                    attempts=job.attempts,
+                    error=job.last_error,
+                    traceback=traceback.format_exc(),
+                )
+                await self.queue.dead_letter(job)
+                return
+            await self.queue.retry(job, self.retry_delay(job.attempts))
+            return
+        await self.queue.ack(job)
+
+    async def _work(self):
+        while True:
+            job = await self.queue.get()
+            self.in_flight += 1
+            try:
+                await self._run(job)
+            finally:
+                self.in_flight -= 1
@@ -1,39 +1,177 @@
-from fastapi import FastAPI, Request
-from strava import StravaAPIClient, StravaUpdatableActivity, StravaWebhookEvent
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from fastapi import FastAPI, HTTPException, Request
+from strava import StravaWebhookEvent
 from config import Settings
-from gemini import GeminiAPIClient
+from pipeline import caption_activity
+import telemetry
+from jobs import (
+    LAMBDA_JOB_KEY,
+    DedupStore,
+    Job,
+    JobDispatchError,
+    LambdaInvoker,
+    SQLiteDedupTier,
+    WorkerPool,
+    build_job_queue,
+    event_key,
+)
 from mangum import Mangum
 
-app = FastAPI()
-handler = Mangum(app)
-settings = Settings()
-strava_client = StravaAPIClient(settings)
-gemini_client = GeminiAPIClient(settings)
+# Settings, clients and their SDKs (httpx, google.genai) are built on first use,
+# so a cold start, and the GET challenge, only pay for FastAPI and the models.
+@lru_cache
+def get_settings() -> Settings:
+    settings = Settings()
+    telemetry.configure(settings.telemetry_mode, settings.telemetry_namespace)
+    return settings
+
+@lru_cache
+def get_athlete_registry():
+    from athletes import AthleteRegistry
+    return AthleteRegistry(get_settings())
+
+@lru_cache
+def get_gemini_client():
+    from gemini import GeminiAPIClient
+    return GeminiAPIClient(get_settings())
+
+@lru_cache
+def get_dedup_store() -> DedupStore:
+    settings = get_settings()
+    return DedupStore(
+        ttl=settings.webhook_dedup_ttl,
+        lease=settings.webhook_dedup_lease,
+        maxsize=settings.webhook_dedup_maxsize,
+        persistent=SQLiteDedupTier(settings.webhook_dedup_path) if settings.webhook_dedup_path else None,
+    )
+
+@lru_cache
+def get_history_store():
+    settings = get_settings()
+    if not settings.history_path:
+        return None
+    from history import ActivityStore
+    return ActivityStore(settings.history_path)
+
+# lru_cache does not stop concurrent first calls from each building a client
+_clients_lock = threading.Lock()
+
+def get_clients():
+    with _clients_lock:
+        return get_athlete_registry(), get_gemini_client()
+
+def clients_ready() -> bool:
+    return bool(get_athlete_registry.cache_info().currsize and get_gemini_client.cache_info().currsize)
+
+async def process_event(event: StravaWebhookEvent):
+    activity_id = event.object_id
+    dedup_store = get_dedup_store()
+    with telemetry.trace("webhook", activity_id=activity_id, owner_id=event.owner_id) as trace:
+        # The first client builds import httpx and google.genai; keep them off the
+        # event loop so they do not stall webhook acknowledgements. Once built,
+        # the getters are plain cache hits and need no thread hop.
+        with telemetry.span("build_clients"):
+            if clients_ready():
+                athletes, gemini_client = get_clients()
+            else:
+                athletes, gemini_client = await asyncio.to_thread(get_clients)
+        athlete = athletes.get(event.owner_id)
+        if athlete is None:
+            telemetry.log(f"No credentials for athlete {event.owner_id}, skipping activity {activity_id}")
+            dedup_store.complete(event_key(event))
+            if trace:
+                trace.properties["action"] = "skipped"
+            return
+        result = await caption_activity(
+            athlete.strava_client,
+            gemini_client,
+            activity_id,
+            history=get_history_store(),
+            persona=athlete.persona,
+        )
+        if trace:
+            trace.properties["action"] = result.action
+    dedup_store.complete(event_key(event))
+    telemetry.log(f"Activity {activity_id} {result.action}", activity_id=activity_id, action=result.action)
+
+@lru_cache
+def get_worker_pool() -> WorkerPool:
+    settings = get_settings()
+    job_queue = build_job_queue(
+        settings.webhook_queue_backend,
+        settings.webhook_queue_path,
+        settings.webhook_queue_maxsize,
+    )
+    return WorkerPool(
+        job_queue,
+        process_event,
+        concurrency=settings.webhook_workers,
+        max_attempts=settings.webhook_max_attempts,
+        retry_backoff=settings.webhook_retry_backoff,
+    )
+
+@lru_cache
+def get_lambda_invoker(function_name: str) -> LambdaInvoker:
+    return LambdaInvoker(function_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_worker_pool().ensure_started()
+    yield
+    await get_worker_pool().stop()
+    if get_athlete_registry.cache_info().currsize:
+        await get_athlete_registry().aclose()
+
+app = FastAPI(lifespan=lifespan)
+# Lifespan off: Mangum would otherwise run shutdown after every invocation and
+# drop the warm connection pool between events
+asgi_handler = Mangum(app, lifespan="off")
+
+def handler(event, context):
+    """Lambda entry point: API Gateway events go to the app, self-invoked jobs
+    to ``process_event``. A failed job raises so Lambda retries it."""
+    if LAMBDA_JOB_KEY in event:
+        job = Job.model_validate(event[LAMBDA_JOB_KEY])
+        # Mangum's loop, so connection pools stay warm across invocations
+        asyncio.get_event_loop().run_until_complete(process_event(job.event))
+        return {"job_id": job.id}
+    return asgi_handler(event, context)
 
 @app.post("/strava/webhook")
-async def webhook(request: StravaWebhookEvent):
+async def webhook(request: StravaWebhookEvent, raw_request: Request):
     aspect_type = request.aspect_type
     object_type = request.object_type
-    print(f"Aspect type: {aspect_type}, Object type: {object_type}")
+    # Only new activities are captioned; updates, including the one our own
+    # PUT triggers, are acknowledged and dropped
     if aspect_type != "create" or object_type != "activity":
         return
-    
-    activity_id = request.object_id
-    print(f"Activity ID: {activity_id}")
-    activity = await strava_client.get_activity(activity_id)
-    print(f"Activity: {activity}")
-
-    if activity.distance < 1000:
-        await strava_client.hide_activity(activity_id)
-        print(f"Activity hidden")
-        return {"message": "Activity hidden"}
-
-    post = await gemini_client.generate_post(activity)
-    await strava_client.update_activity(activity_id, post)	
-    print(f"Post generated")
-    return {"message": "Post generated"}
+
+    dedup_store = get_dedup_store()
+    key = event_key(request)
+    if not dedup_store.claim(key):
+        return {"message": "Duplicate event"}
+
+    job = Job(event=request)
+    aws_context = raw_request.scope.get("aws.context")
+    try:
+        if aws_context is not None:
+            # On Lambda nothing runs after the response until the next
+            # invocation, so the job gets an invocation of its own
+            await get_lambda_invoker(aws_context.function_name).put(job)
+        else:
+            worker_pool = get_worker_pool()
+            worker_pool.ensure_started()
+            await worker_pool.queue.put(job)
+    except JobDispatchError as e:
+        dedup_store.release(key)
+        # Strava retries deliveries that are not acknowledged with a 200
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"message": "Event queued"}
 
 @app.get("/strava/webhook")
 def webhook_get(request: Request):
     challenge = request.query_params["hub.challenge"]
-    return {"hub.challenge": challenge}
\ No newline at end of file
+    return {"hub.challenge": challenge}
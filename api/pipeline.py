@@ -0,0 +1,151 @@
+"""
+The Klaus captioning flow shared by the webhook worker and the backfill CLI:
+fetch the activity, hide short walks, otherwise generate and write a post.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+from pydantic import BaseModel
+import telemetry
+from strava.ratelimit import PRIORITY_WEBHOOK
+from gemini.models import GeminiPost, Persona
+
+if TYPE_CHECKING:
+    from strava import StravaAPIClient
+    from strava.models import DetailedActivity
+    from gemini import GeminiAPIClient
+    from history import ActivityStore
+
+MIN_POST_DISTANCE = 1000
+
+
+class CaptionResult(BaseModel):
+    activity_id: int
+    action: str
+    post: Optional[GeminiPost] = None
+    error: Optional[str] = None
+
+
+def _history_context(
+    history: Optional["ActivityStore"], activity: "DetailedActivity", dry_run: bool
+) -> Optional[Dict[str, Any]]:
+    """Prompt context from ``history``; dry runs preview it without storing the activity."""
+    if not history:
+        return None
+    return history.preview_context(activity) if dry_run else history.context(activity)
+
+
+async def caption_activity(
+    strava_client: "StravaAPIClient",
+    gemini_client: "GeminiAPIClient",
+    activity_id: int,
+    priority: int = PRIORITY_WEBHOOK,
+    dry_run: bool = False,
+    history: Optional["ActivityStore"] = None,
+    persona: Optional[Persona] = None,
+) -> CaptionResult:
+    """Caption one activity as ``persona``.
+
+    With a ``history`` store the activity is recorded and the model gets its
+    historical context; the post is recorded once written. Dry runs leave the
+    store untouched.
+    """
+    with telemetry.span("fetch_activity"):
+        activity = await strava_client.get_activity(activity_id, priority)
+    if history and not dry_run:
+        history.add_activity(activity)
+
+    if activity.distance < MIN_POST_DISTANCE:
+        if dry_run:
+            return CaptionResult(activity_id=activity_id, action="hidden")
+        with telemetry.span("update_activity"):
+            await strava_client.hide_activity(activity_id, priority, parse_response=False)
+        return CaptionResult(activity_id=activity_id, action="hidden")
+
+    post = await gemini_client.generate_post(activity, _history_context(history, activity, dry_run), persona)
+    if dry_run:
+        return CaptionResult(activity_id=activity_id, action="captioned", post=post)
+    with telemetry.span("update_activity"):
+        await strava_client.update_activity(activity_id, post, priority, parse_response=False)
+    if history:
+        history.add_post(activity_id, post)
+    return CaptionResult(activity_id=activity_id, action="captioned", post=post)
+
+
+async def caption_activities(
+    strava_client: "StravaAPIClient",
+    gemini_client: "GeminiAPIClient",
+    activity_ids: Sequence[int],
+    priority: int = PRIORITY_WEBHOOK,
+    dry_run: bool = False,
+    history: Optional["ActivityStore"] = None,
+    persona: Optional[Persona] = None,
+    batch_size: Optional[int] = None,
+) -> List[CaptionResult]:
+    """``caption_activity`` for many activities, generating posts in batches.
+
+    Failures are per activity: they come back as ``failed`` results.
+    """
+    results = {}
+
+    def fail(activity_id: int, e: Exception):
+        results[activity_id] = CaptionResult(activity_id=activity_id, action="failed", error=f"{type(e).__name__}: {e}")
+
+    async def fetch(activity_id: int):
+        try:
+            with telemetry.span("fetch_activity"):
+                return await strava_client.get_activity(activity_id, priority)
+        except Exception as e:
+            fail(activity_id, e)
+
+    async def hide(activity_id: int):
+        try:
+            if not dry_run:
+                with telemetry.span("update_activity"):
+                    await strava_client.hide_activity(activity_id, priority, parse_response=False)
+            results[activity_id] = CaptionResult(activity_id=activity_id, action="hidden")
+        except Exception as e:
+            fail(activity_id, e)
+
+    async def update(activity_id: int, post: GeminiPost):
+        try:
+            if not dry_run:
+                with telemetry.span("update_activity"):
+                    await strava_client.update_activity(activity_id, post, priority, parse_response=False)
+                if history:
+                    history.add_post(activity_id, post)
+            results[activity_id] = CaptionResult(activity_id=activity_id, action="captioned", post=post)
+        except Exception as e:
+            fail(activity_id, e)
+
+    activities = [activity for activity in await asyncio.gather(*(fetch(i) for i in activity_ids)) if activity]
+    short: List[int] = []
+    to_caption = []
+    histories = {}
+    for activity in activities:
+        try:
+            if history and not dry_run:
+                history.add_activity(activity)
+            if activity.distance < MIN_POST_DISTANCE:
+                short.append(activity.id)
+                continue
+            if history:
+                histories[activity.id] = _history_context(history, activity, dry_run)
+            to_caption.append(activity)
+        except Exception as e:
+            fail(activity.id, e)
+
+    try:
+        posts = await gemini_client.generate_posts(to_caption, histories, persona, batch_size)
+    except Exception as e:
+        posts = {}
+        for activity in to_caption:
+            fail(activity.id, e)
+    for activity in to_caption:
+        if activity.id not in posts and activity.id not in results:
+            fail(activity.id, RuntimeError("No post generated"))
+    await asyncio.gather(
+        *(hide(activity_id) for activity_id in short),
+        *(update(activity_id, post) for activity_id, post in posts.items()),
+    )
+    return [results[activity_id] for activity_id in activity_ids if activity_id in results]
+
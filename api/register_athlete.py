@@ -0,0 +1,40 @@
+"""
+Add or update an athlete's credentials and persona in the athlete store
+(``strava_athlete_store``/``strava_athlete_path``). Tokens rotated from an
+earlier registration are removed from the token store; warm processes pick
+up the change within ``strava_athlete_cache_ttl``.
+
+    python api/register_athlete.py 12345 --refresh-token abc --name Klaus \
+        --description "a lovable and energetic Labrador Retriever mix" --home "Austin, Texas"
+"""
+import argparse
+from athletes import AthleteRecord, build_athlete_store
+from config import Settings
+from gemini.models import Persona
+from strava.tokens import build_token_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Register a Strava athlete for captioning.")
+    parser.add_argument("athlete_id", type=int)
+    parser.add_argument("--refresh-token", required=True, help="From the athlete's OAuth authorization")
+    defaults = Persona()
+    parser.add_argument("--name", default=defaults.name)
+    parser.add_argument("--description", default=defaults.description)
+    parser.add_argument("--home", default=defaults.home)
+    parser.add_argument("--style", help="Extra guidance on voice")
+    args = parser.parse_args()
+
+    settings = Settings()
+    if settings.strava_athlete_store == "memory":
+        raise SystemExit("strava_athlete_store is 'memory'; set it to 'file' or 'sqlite' to persist athletes")
+    persona = Persona(name=args.name, description=args.description, home=args.home, style=args.style)
+    build_athlete_store(settings).save(
+        AthleteRecord(athlete_id=args.athlete_id, refresh_token=args.refresh_token, persona=persona)
+    )
+    build_token_store(settings).delete(str(args.athlete_id))
+    print(f"Registered athlete {args.athlete_id} as {persona.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ including activity management, authentication, and data models.
 
 # Re-export main classes and functions for convenient imports
 from .models import StravaUpdatableActivity, StravaWebhookEvent
-from .client import StravaAPIClient
 
 __all__ = [
     "StravaUpdatableActivity",
@@ -16,3 +15,11 @@ __all__ = [
 ]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str):
+    # The client pulls in httpx; import it on first use to keep cold starts lean
+    if name == "StravaAPIClient":
+        from .client import StravaAPIClient
+        return StravaAPIClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,81 +1,248 @@
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, Optional, Dict, Any, List
 import httpx
-from .models import DetailedActivity, StravaUpdatableActivity, StravaAPIError, StravaConfig
+import telemetry
+from pydantic import TypeAdapter
+from .models import DetailedActivity, SummaryActivity, StravaUpdatableActivity, StravaAPIError, StravaConfig, StravaToken
+from .tokens import TokenManager, build_token_store
+from .ratelimit import PRIORITY_BACKFILL, PRIORITY_WEBHOOK, RateLimitGovernor
+from .streams import DEFAULT_STREAM_KEYS, ActivityStreams
+
+SUMMARY_ACTIVITIES = TypeAdapter(List[SummaryActivity])
+
+
+def build_http_client(settings: StravaConfig) -> httpx.AsyncClient:
+	"""Build the pooled keep-alive client shared by every Strava request.
+
+	HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``).
+	"""
+	timeout = httpx.Timeout(settings.strava_timeout, connect=settings.strava_connect_timeout)
+	limits = httpx.Limits(
+		max_connections=settings.strava_max_connections,
+		max_keepalive_connections=settings.strava_max_keepalive_connections,
+		keepalive_expiry=settings.strava_keepalive_expiry,
+	)
+	return httpx.AsyncClient(
+		base_url=settings.strava_base_url,
+		timeout=timeout,
+		limits=limits,
+		http2=settings.strava_http2,
+	)
 
 
 class StravaAPIClient:
-	def __init__(self, settings: StravaConfig):
+	def __init__(
+		self,
+		settings: StravaConfig,
+		http_client: Optional[httpx.AsyncClient] = None,
+		token_manager: Optional[TokenManager] = None,
+		governor: Optional[RateLimitGovernor] = None,
+	):
+		self.settings = settings
 		self.client_id = settings.strava_client_id
 		self.client_secret = settings.strava_client_secret
-		self.refresh_token = settings.strava_refresh_token
 		self.base_url = settings.strava_base_url
 		self.access_token: Optional[str] = None
+		self._http_client = http_client
+		self.tokens = token_manager or TokenManager(
+			build_token_store(settings),
+			settings.strava_refresh_token,
+			refresh_margin=settings.strava_token_refresh_margin,
+		)
+		self.governor = governor or RateLimitGovernor(settings.strava_rate_limit_reserve)
+		self.rate_limit_retries = settings.strava_rate_limit_retries
+
+	@property
+	def http_client(self) -> httpx.AsyncClient:
+		"""The shared connection pool, (re)opened on first use."""
+		if self._http_client is None or self._http_client.is_closed:
+			self._http_client = build_http_client(self.settings)
+		return self._http_client
+
+	async def aclose(self):
+		"""Close the connection pool. The next request opens a fresh one."""
+		if self._http_client is None:
+			return
+		await self._http_client.aclose()
+		self._http_client = None
+
+	def _auth_headers(self) -> Dict[str, str]:
+		return {"Authorization": f"Bearer {self.access_token}"}
+
+	def _raise_for_status(self, response: httpx.Response, message: str):
+		if response.status_code == 200:
+			return
+		response_data: Optional[Dict[str, Any]] = None
+		try:
+			response_data = response.json() if response.content else None
+		except ValueError:
+			pass
+		raise StravaAPIError(
+			f"{message}: {response.text}",
+			status_code=response.status_code,
+			response_data=response_data
+		)
+
+	async def _request(self, method: str, path: str, priority: int = PRIORITY_WEBHOOK, **kwargs) -> httpx.Response:
+		"""Send an authenticated request, refreshing the token and retrying once on a 401."""
+		response = await self._send(method, path, priority, **kwargs)
+		if response.status_code != 401:
+			return response
+		# The token was revoked or rotated before it expired
+		telemetry.log(f"Strava rejected the access token for {method} {path}, refreshing", status=401)
+		sent = kwargs.get("headers", {}).get("Authorization", "")
+		self.tokens.invalidate(sent.removeprefix("Bearer "))
+		await self.check_access_token()
+		kwargs["headers"] = {**kwargs.get("headers", {}), **self._auth_headers()}
+		return await self._send(method, path, priority, **kwargs)
+
+	async def _send(self, method: str, path: str, priority: int, **kwargs) -> httpx.Response:
+		"""Send a request through the rate-limit governor, retrying 429s."""
+		is_read = method == "GET"
+		for attempt in range(self.rate_limit_retries + 1):
+			await self.governor.acquire(priority, is_read)
+			response = await self.http_client.request(method, path, **kwargs)
+			telemetry.record_http(response)
+			if response.status_code != 429:
+				self.governor.update(response.headers)
+				return response
+			# Back off even on the last attempt so later callers wait too
+			delay = self.governor.on_rate_limited(response.headers, is_read)
+			if attempt == self.rate_limit_retries:
+				break
+			telemetry.log(f"Strava rate limited {method} {path}, retrying in {delay:.0f}s", status=429, retry_in=delay)
+		return response
 
 	# https://developers.strava.com/docs/authentication/#detailsaboutrequestingaccess
-	def refresh_access_token(self):
-		url = f"{self.base_url}/oauth/token"
+	async def refresh_access_token(self, refresh_token: str) -> StravaToken:
 		data = {
 			"client_id": self.client_id,
 			"client_secret": self.client_secret,
 			"grant_type": "refresh_token",
-			"refresh_token": self.refresh_token
+			"refresh_token": refresh_token
 		}
-		response = httpx.post(url, data=data)
-		self.access_token = response.json()["access_token"]
-		self.refresh_token = response.json()["refresh_token"]
-  
-	def check_access_token(self):
-		# TODO: Check if the access token is expired
-		if not self.access_token:
-			self.refresh_access_token()
-  
-	def get_athlete(self):
-		self.check_access_token()
-		url = f"{self.base_url}/athlete"
-		response = httpx.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
-		return response.json()
-  
-	def get_activities(self):
-		self.check_access_token()
-		url = f"{self.base_url}/activities"
-		response = httpx.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
+		with telemetry.span("token_refresh"):
+			response = await self.http_client.post("/oauth/token", data=data)
+		telemetry.record_http(response)
+		self._raise_for_status(response, "Failed to refresh access token")
+		return StravaToken.model_validate_json(response.content)
+
+	async def check_access_token(self):
+		"""Ensure a non-expired access token, refreshing (once) if needed."""
+		self.access_token = await self.tokens.get_access_token(self.refresh_access_token)
+
+	async def get_athlete(self, priority: int = PRIORITY_WEBHOOK):
+		await self.check_access_token()
+		response = await self._request("GET", "/athlete", priority, headers=self._auth_headers())
 		return response.json()
 
-	def get_activity(self, activity_id: str) -> DetailedActivity:
+	# https://developers.strava.com/docs/reference/#api-Activities-getLoggedInAthleteActivities
+	async def get_activities(
+		self,
+		before: Optional[int] = None,
+		after: Optional[int] = None,
+		page: int = 1,
+		per_page: int = 30,
+		priority: int = PRIORITY_WEBHOOK,
+	) -> List[SummaryActivity]:
+		"""Get one page of the athlete's activities, newest first."""
+		await self.check_access_token()
+		params: Dict[str, int] = {"page": page, "per_page": per_page}
+		if before is not None:
+			params["before"] = before
+		if after is not None:
+			params["after"] = after
+		response = await self._request(
+			"GET", "/athlete/activities", priority, headers=self._auth_headers(), params=params
+		)
+		self._raise_for_status(response, "Failed to list activities")
+		return SUMMARY_ACTIVITIES.validate_json(response.content)
+
+	async def iter_activities(
+		self,
+		before: Optional[int] = None,
+		after: Optional[int] = None,
+		per_page: int = 100,
+		priority: int = PRIORITY_BACKFILL,
+	) -> AsyncIterator[SummaryActivity]:
+		"""Stream activities one page in memory at a time.
+
+		Without ``after`` Strava lists newest first, and pages are walked with a
+		``before`` cursor from the last activity so new uploads do not shift
+		them. With ``after`` it lists oldest first; new uploads land on the
+		last page, so page numbers are stable.
+		"""
+		page = 1
+		while True:
+			activities = await self.get_activities(before, after, page, per_page, priority)
+			for activity in activities:
+				yield activity
+			if len(activities) < per_page:
+				return
+			if after is None:
+				before = int(activities[-1].start_date.timestamp())
+			else:
+				page += 1
+
+	async def get_activity(self, activity_id: str, priority: int = PRIORITY_WEBHOOK) -> DetailedActivity:
 		"""Get a detailed activity by ID."""
-		self.check_access_token()
-		url = f"{self.base_url}/activities/{activity_id}"
-		response = httpx.get(url, headers={"Authorization": f"Bearer {self.access_token}"})
-		
-		if response.status_code != 200:
-			raise StravaAPIError(
-				f"Failed to get activity {activity_id}: {response.text}",
-				status_code=response.status_code,
-				response_data=response.json() if response.text else None
-			)
-		
-		return DetailedActivity(**response.json())
-
-	def update_activity(self, activity_id: str, activity: StravaUpdatableActivity) -> DetailedActivity:
-		"""Update an activity with the provided data."""
-		self.check_access_token()
-		url = f"{self.base_url}/activities/{activity_id}"
-		
+		await self.check_access_token()
+		response = await self._request("GET", f"/activities/{activity_id}", priority, headers=self._auth_headers())
+		self._raise_for_status(response, f"Failed to get activity {activity_id}")
+		return DetailedActivity.model_validate_json(response.content)
+
+	# https://developers.strava.com/docs/reference/#api-Streams-getActivityStreams
+	async def get_activity_streams(
+		self,
+		activity_id: str,
+		keys: List[str] = DEFAULT_STREAM_KEYS,
+		priority: int = PRIORITY_WEBHOOK,
+	) -> ActivityStreams:
+		"""Get only the requested streams, decoded into NumPy arrays."""
+		await self.check_access_token()
+		response = await self._request(
+			"GET",
+			f"/activities/{activity_id}/streams",
+			priority,
+			headers=self._auth_headers(),
+			params={"keys": ",".join(keys), "key_by_type": "true"},
+		)
+		self._raise_for_status(response, f"Failed to get streams for activity {activity_id}")
+		return ActivityStreams.from_json(response.content)
+
+	async def update_activity(
+		self,
+		activity_id: str,
+		activity: StravaUpdatableActivity,
+		priority: int = PRIORITY_WEBHOOK,
+		parse_response: bool = True,
+	) -> Optional[DetailedActivity]:
+		"""Update an activity with the provided data.
+
+		Pass ``parse_response=False`` to skip validating the returned activity.
+		"""
+		await self.check_access_token()
+
 		# Convert Pydantic model to dict, excluding None values
 		activity_data = activity.model_dump(exclude_none=True)
-		
-		response = httpx.put(url, headers={"Authorization": f"Bearer {self.access_token}"}, json=activity_data)
-		
-		if response.status_code != 200:
-			raise StravaAPIError(
-				f"Failed to update activity {activity_id}: {response.text}",
-				status_code=response.status_code,
-				response_data=response.json() if response.text else None
-			)
-		
-		return DetailedActivity(**response.json())
-
-	def hide_activity(self, activity_id: str) -> DetailedActivity:
+
+		response = await self._request(
+			"PUT",
+			f"/activities/{activity_id}",
+			priority,
+			headers=self._auth_headers(),
+			json=activity_data
+		)
+		self._raise_for_status(response, f"Failed to update activity {activity_id}")
+		if not parse_response:
+			return None
+		return DetailedActivity.model_validate_json(response.content)
+
+	async def hide_activity(
+		self,
+		activity_id: str,
+		priority: int = PRIORITY_WEBHOOK,
+		parse_response: bool = True,
+	) -> Optional[DetailedActivity]:
 		"""Hide an activity from the home feed."""
 		activity_update = StravaUpdatableActivity(hide_from_home=True)
-		return self.update_activity(activity_id, activity_update)
\ No newline at end of file
+		return await self.update_activity(activity_id, activity_update, priority, parse_response)
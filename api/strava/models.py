@@ -1,6 +1,10 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Generic, Iterator, Sequence, TypeVar, get_args
 from datetime import datetime
-from pydantic import BaseModel, Field
+import time
+from pydantic import BaseModel, Field, GetCoreSchemaHandler, TypeAdapter
+from pydantic_core import core_schema
+
+T = TypeVar("T")
 
 class StravaConfig:
     """Configuration for Strava API integration."""
@@ -9,6 +13,22 @@ class StravaConfig:
     access_token: Optional[str] = None
     refresh_token: Optional[str] = None
     base_url: str = "https://www.strava.com/api/v3"
+    strava_http2: bool = False
+    strava_timeout: float = 10.0
+    strava_connect_timeout: float = 5.0
+    strava_max_connections: int = 20
+    strava_max_keepalive_connections: int = 10
+    strava_keepalive_expiry: float = 30.0
+    strava_token_store: str = "memory"
+    strava_token_path: str = "/tmp/strava_tokens.json"
+    strava_token_refresh_margin: int = 300
+    strava_rate_limit_reserve: float = 0.2
+    strava_rate_limit_retries: int = 3
+    strava_athlete_id: Optional[int] = None
+    strava_athlete_store: str = "memory"
+    strava_athlete_path: str = "/tmp/strava_athletes.json"
+    strava_athlete_cache_size: int = 256
+    strava_athlete_cache_ttl: float = 300
 
 
 class StravaAPIError(Exception):
@@ -20,6 +40,77 @@ class StravaAPIError(Exception):
         super().__init__(self.message)
 
 
+class LazyList(Sequence[T], Generic[T]):
+    """A list of sub-models validated on first access rather than on parse.
+
+    Large nested collections (segment efforts, laps, splits) are kept as the
+    decoded JSON until something reads them, so parsing an activity only pays
+    for the scalars it actually uses. Serializes back to the raw items.
+    """
+    def __init__(self, raw: List[Any], adapter: TypeAdapter):
+        self.raw = raw
+        self._adapter = adapter
+        self._items: Optional[List[T]] = None
+
+    @property
+    def items(self) -> List[T]:
+        if self._items is None:
+            self._items = self._adapter.validate_python(self.raw)
+        return self._items
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        state = "validated" if self._items is not None else "pending"
+        return f"LazyList({len(self.raw)} items, {state})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        (item_type,) = get_args(source_type)
+        adapter = TypeAdapter(List[item_type])
+
+        def validate(value: Any) -> "LazyList":
+            if isinstance(value, LazyList):
+                return value
+            if not isinstance(value, list):
+                raise ValueError("Input should be a valid list")
+            return cls(value, adapter)
+
+        # The plain validator has no schema of its own; describe it as the list
+        list_schema = handler.generate_schema(List[item_type])
+        return core_schema.no_info_plain_validator_function(
+            validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda value: value.raw),
+            json_schema_input_schema=list_schema,
+            # Serialization emits the raw items, which have the same shape
+            metadata={"pydantic_js_functions": [lambda _, json_handler: json_handler(list_schema)]},
+        )
+
+
+# https://developers.strava.com/docs/authentication/#refreshingexpiredaccesstokens
+class StravaToken(BaseModel):
+    """An OAuth access/refresh token pair."""
+    access_token: str = Field(..., description="Short-lived token used to call the API")
+    refresh_token: str = Field(..., description="Token used to obtain the next access token")
+    expires_at: int = Field(..., description="Epoch seconds at which the access token expires")
+
+    def expires_within(self, margin: float) -> bool:
+        """Whether the access token expires in the next ``margin`` seconds."""
+        return self.expires_at - margin <= time.time()
+
+
 # Supporting Models for DetailedActivity
 class PolylineMap(BaseModel):
     """Represents a polyline map."""
@@ -112,6 +203,23 @@ class StravaUpdatableActivity(BaseModel):
     gear_id: Optional[str] = Field(None, description="Identifier for the gear used during the activity")
 
 
+# https://developers.strava.com/docs/reference/#api-models-SummaryActivity
+class SummaryActivity(BaseModel):
+    """Summary representation of an activity, as returned by activity lists."""
+    id: int = Field(..., description="The unique identifier of the activity")
+    name: str = Field(..., description="The name of the activity")
+    distance: float = Field(..., description="The activity's distance, in meters")
+    moving_time: int = Field(..., description="The activity's moving time, in seconds")
+    elapsed_time: int = Field(..., description="The activity's elapsed time, in seconds")
+    sport_type: str = Field(..., description="An instance of SportType")
+    start_date: datetime = Field(..., description="The time at which the activity was started")
+    start_date_local: datetime = Field(..., description="The time at which the activity was started in the local timezone")
+    hide_from_home: Optional[bool] = Field(None, description="Whether the activity is muted")
+    athlete: Optional[MetaAthlete] = Field(None, description="An instance of MetaAthlete")
+    total_elevation_gain: Optional[float] = Field(None, description="The activity's total elevation gain")
+    start_latlng: Optional[List[float]] = Field(None, description="The activity's start coordinates")
+
+
 # https://developers.strava.com/docs/reference/#api-models-DetailedActivity
 class DetailedActivity(BaseModel):
     """
@@ -164,13 +272,13 @@ class DetailedActivity(BaseModel):
     photos: Optional[PhotosSummary] = Field(None, description="An instance of PhotosSummary")
     gear: Optional[SummaryGear] = Field(None, description="An instance of SummaryGear")
     calories: Optional[float] = Field(None, description="The number of kilocalories consumed during this activity")
-    segment_efforts: Optional[List[DetailedSegmentEffort]] = Field(None, description="A collection of DetailedSegmentEffort objects")
+    segment_efforts: Optional[LazyList[DetailedSegmentEffort]] = Field(None, description="A collection of DetailedSegmentEffort objects")
     device_name: Optional[str] = Field(None, description="The name of the device used to record the activity")
     embed_token: Optional[str] = Field(None, description="The token used to embed a Strava activity")
-    splits_metric: Optional[List[Split]] = Field(None, description="The splits of this activity in metric units (for runs)")
-    splits_standard: Optional[List[Split]] = Field(None, description="The splits of this activity in imperial units (for runs)")
-    laps: Optional[List[Lap]] = Field(None, description="A collection of Lap objects")
-    best_efforts: Optional[List[DetailedSegmentEffort]] = Field(None, description="A collection of DetailedSegmentEffort objects")
+    splits_metric: Optional[LazyList[Split]] = Field(None, description="The splits of this activity in metric units (for runs)")
+    splits_standard: Optional[LazyList[Split]] = Field(None, description="The splits of this activity in imperial units (for runs)")
+    laps: Optional[LazyList[Lap]] = Field(None, description="A collection of Lap objects")
+    best_efforts: Optional[LazyList[DetailedSegmentEffort]] = Field(None, description="A collection of DetailedSegmentEffort objects")
     
     # Additional fields that might be present
     start_latlng: Optional[List[float]] = Field(None, description="The activity's start coordinates")
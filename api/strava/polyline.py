@@ -0,0 +1,146 @@
+"""
+Google encoded polyline decoding and route geometry.
+
+``decode_polyline`` is a vectorized NumPy decoder returning an ``(N, 2)``
+float64 array of ``[lat, lng]``; ``decode_polyline_py`` is the pure-Python
+reference it is checked against.
+https://developers.google.com/maps/documentation/utilities/polylinealgorithm
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel, Field
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def decode_polyline_py(polyline: str, precision: int = 5) -> List[Tuple[float, float]]:
+	"""Reference decoder, one character at a time."""
+	factor = 10 ** precision
+	points = []
+	index = lat = lng = 0
+	while index < len(polyline):
+		deltas = []
+		for _ in range(2):
+			shift = result = 0
+			while True:
+				byte = ord(polyline[index]) - 63
+				index += 1
+				result |= (byte & 0x1F) << shift
+				shift += 5
+				if byte < 0x20:
+					break
+			deltas.append(~(result >> 1) if result & 1 else result >> 1)
+		lat += deltas[0]
+		lng += deltas[1]
+		points.append((lat / factor, lng / factor))
+	return points
+
+
+def decode_polyline(polyline: str, precision: int = 5) -> np.ndarray:
+	"""Decode into an ``(N, 2)`` array without a per-character Python loop.
+
+	Raises ``ValueError`` for characters outside the encoding's range and for
+	a truncated polyline whose last value never terminates.
+	"""
+	if not polyline:
+		return np.empty((0, 2), dtype=np.float64)
+	try:
+		raw = polyline.encode("ascii")
+	except UnicodeEncodeError:
+		raise ValueError("Polyline contains non-ASCII characters") from None
+	chunks = np.frombuffer(raw, dtype=np.uint8).astype(np.int64) - 63
+	if chunks.min() < 0 or chunks.max() > 0x3F:
+		raise ValueError("Polyline contains characters outside '?'..'~'")
+	is_last = chunks < 0x20
+	if not is_last[-1]:
+		raise ValueError("Polyline is truncated: its last value is unterminated")
+	# Each value is a run of 5-bit chunks ending with one below 0x20
+	ends = np.flatnonzero(is_last)
+	starts = np.concatenate(([0], ends[:-1] + 1))
+	position = np.arange(len(chunks)) - np.repeat(starts, ends - starts + 1)
+	values = np.add.reduceat((chunks & 0x1F) << (5 * position), starts)
+	values = np.where(values & 1, ~(values >> 1), values >> 1)
+	deltas = values[: len(values) // 2 * 2].reshape(-1, 2)
+	return np.cumsum(deltas, axis=0) / 10 ** precision
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+	"""Great-circle distance in meters; works element-wise on arrays."""
+	lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+	a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+	return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class RouteMetrics(BaseModel):
+	"""Route facts derived from a decoded polyline."""
+	n_points: int = Field(..., description="Number of decoded points")
+	length_m: float = Field(..., description="Haversine length of the route, in meters")
+	bbox: Tuple[float, float, float, float] = Field(..., description="min_lat, min_lng, max_lat, max_lng")
+	shape: str = Field(..., description="loop, out_and_back or point_to_point")
+	max_distance_from_home_m: float = Field(..., description="Farthest point from home, in meters")
+	turn_count: int = Field(..., description="Heading changes sharper than the turn angle")
+
+
+def _resample(points: np.ndarray, cumulative: np.ndarray, spacing: float) -> np.ndarray:
+	"""Points ``spacing`` meters apart along the route, to ignore GPS jitter.
+
+	Interpolated rather than snapped to the nearest input point, so segments
+	longer than ``spacing`` don't yield repeated points and zero-length steps.
+	"""
+	marks = np.arange(0, cumulative[-1], spacing)
+	return np.column_stack((np.interp(marks, cumulative, points[:, 0]), np.interp(marks, cumulative, points[:, 1])))
+
+
+def _shape(points: np.ndarray, length: float, cell_m: float = 25.0) -> str:
+	end_gap = haversine_m(points[0, 0], points[0, 1], points[-1, 0], points[-1, 1])
+	if end_gap > max(100.0, 0.1 * length):
+		return "point_to_point"
+	# Out-and-back walks revisit the outbound cells on the way home
+	cell_deg = cell_m / 111_320
+	cells = np.floor(points / cell_deg).astype(np.int64)
+	keys = cells[:, 0] * 10_000_019 + cells[:, 1]
+	half = len(keys) // 2
+	returning = np.isin(keys[half:], keys[:half])
+	return "out_and_back" if returning.mean() > 0.6 else "loop"
+
+
+def route_metrics(
+	points: np.ndarray,
+	home: Optional[Tuple[float, float]] = None,
+	turn_angle: float = 60.0,
+	turn_spacing: float = 25.0,
+) -> Optional[RouteMetrics]:
+	"""Metrics for an ``(N, 2)`` point array; ``home`` defaults to the start."""
+	if len(points) < 2:
+		return None
+	lat, lng = points[:, 0], points[:, 1]
+	steps = haversine_m(lat[:-1], lng[:-1], lat[1:], lng[1:])
+	cumulative = np.concatenate(([0.0], np.cumsum(steps)))
+	length = float(cumulative[-1])
+
+	home_lat, home_lng = home or (lat[0], lng[0])
+	from_home = haversine_m(home_lat, home_lng, lat, lng)
+
+	turn_count = 0
+	resampled = _resample(points, cumulative, turn_spacing)
+	if len(resampled) >= 3:
+		d = np.diff(np.radians(resampled), axis=0)
+		bearings = np.degrees(np.arctan2(d[:, 1] * np.cos(np.radians(resampled[:-1, 0])), d[:, 0]))
+		change = np.abs((np.diff(bearings) + 180) % 360 - 180)
+		turn_count = int(np.count_nonzero(change > turn_angle))
+
+	return RouteMetrics(
+		n_points=len(points),
+		length_m=round(length, 1),
+		bbox=(float(lat.min()), float(lng.min()), float(lat.max()), float(lng.max())),
+		shape=_shape(points, length),
+		max_distance_from_home_m=round(float(from_home.max()), 1),
+		turn_count=turn_count,
+	)
+
+
+@lru_cache(maxsize=64)
+def polyline_route_metrics(polyline: str) -> Optional[RouteMetrics]:
+	"""Cached ``route_metrics`` for an encoded polyline."""
+	return route_metrics(decode_polyline(polyline))
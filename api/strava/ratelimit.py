@@ -0,0 +1,130 @@
+"""
+Strava rate-limit governor.
+
+Strava reports usage against a 15-minute and a daily window on every response
+(``X-RateLimit-*`` overall, ``X-ReadRateLimit-*`` for reads). Windows reset on
+natural quarter-hours and at midnight UTC.
+https://developers.strava.com/docs/rate-limits/
+
+The governor keeps a local view of the remaining budget, counting requests as
+they are sent and correcting from headers as responses arrive. Lower-priority
+requests (backfill) leave a reserve of each window for higher-priority ones
+(webhooks), and everyone waits for the window to reset after a 429.
+"""
+import asyncio
+import math
+import time
+from typing import Dict, List, Mapping, Optional
+
+PRIORITY_WEBHOOK = 0
+PRIORITY_BACKFILL = 1
+
+WINDOW_SECONDS = [15 * 60, 24 * 60 * 60]
+
+
+def _next_reset(now: float, window: int) -> float:
+	return (now // window + 1) * window
+
+
+class _Budget:
+	"""Usage against one rate-limit window."""
+	def __init__(self, window: int):
+		self.window = window
+		self.limit: Optional[int] = None
+		self.usage = 0
+		self.resets_at = _next_reset(time.time(), window)
+
+	def roll(self, now: float):
+		if now >= self.resets_at:
+			self.usage = 0
+			self.resets_at = _next_reset(now, self.window)
+
+	def observe(self, limit: int, usage: int, now: float):
+		self.roll(now)
+		self.limit = limit
+		self.usage = usage
+
+	def is_exhausted(self, reserve: int = 0) -> bool:
+		return self.limit is not None and self.usage + reserve >= self.limit
+
+
+def _parse_pair(value: Optional[str]) -> Optional[List[int]]:
+	if not value:
+		return None
+	try:
+		return [int(part) for part in value.split(",")]
+	except ValueError:
+		return None
+
+
+class RateLimitGovernor:
+	"""Admits requests against Strava's shared application quota."""
+	def __init__(self, reserve_fraction: float = 0.2, max_backoff: float = 60.0):
+		self.reserve_fraction = reserve_fraction
+		self.max_backoff = max_backoff
+		self.budgets: Dict[str, List[_Budget]] = {
+			"overall": [_Budget(window) for window in WINDOW_SECONDS],
+			"read": [_Budget(window) for window in WINDOW_SECONDS],
+		}
+		self.blocked_until = 0.0
+		self._consecutive_429s = 0
+
+	def _applicable(self, is_read: bool) -> List[_Budget]:
+		budgets = list(self.budgets["overall"])
+		if is_read:
+			budgets += self.budgets["read"]
+		return budgets
+
+	def _reserve(self, budget: _Budget, priority: int) -> int:
+		if priority <= PRIORITY_WEBHOOK or budget.limit is None:
+			return 0
+		return math.ceil(budget.limit * self.reserve_fraction)
+
+	def wait_time(self, priority: int = PRIORITY_WEBHOOK, is_read: bool = True) -> float:
+		"""Seconds until a request of this priority may be sent."""
+		now = time.time()
+		wait = self.blocked_until - now
+		for budget in self._applicable(is_read):
+			budget.roll(now)
+			if budget.is_exhausted(self._reserve(budget, priority)):
+				wait = max(wait, budget.resets_at - now)
+		return max(wait, 0.0)
+
+	async def acquire(self, priority: int = PRIORITY_WEBHOOK, is_read: bool = True):
+		"""Wait for budget, then count the request against it."""
+		while True:
+			wait = self.wait_time(priority, is_read)
+			if wait <= 0:
+				break
+			await asyncio.sleep(wait)
+		for budget in self._applicable(is_read):
+			budget.usage += 1
+
+	def update(self, headers: Mapping[str, str]):
+		"""Correct the local view from a successful response's headers."""
+		self._observe(headers)
+		self._consecutive_429s = 0
+
+	def _observe(self, headers: Mapping[str, str]):
+		now = time.time()
+		for name, prefix in (("overall", "X-RateLimit"), ("read", "X-ReadRateLimit")):
+			limits = _parse_pair(headers.get(f"{prefix}-Limit"))
+			usages = _parse_pair(headers.get(f"{prefix}-Usage"))
+			if not limits or not usages:
+				continue
+			for budget, limit, usage in zip(self.budgets[name], limits, usages):
+				budget.observe(limit, usage, now)
+
+	def on_rate_limited(self, headers: Mapping[str, str], is_read: bool = True) -> float:
+		"""Back off after a 429; returns the delay before the next attempt."""
+		self._observe(headers)
+		now = time.time()
+		exhausted = [budget for budget in self._applicable(is_read) if budget.is_exhausted()]
+		if exhausted:
+			resume_at = max(budget.resets_at for budget in exhausted)
+		else:
+			# Limit hit without headers saying so: back off exponentially
+			self._consecutive_429s += 1
+			resume_at = now + min(2 ** self._consecutive_429s, self.max_backoff)
+		self.blocked_until = max(self.blocked_until, resume_at)
+		return self.blocked_until - now
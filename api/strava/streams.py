@@ -0,0 +1,153 @@
+"""
+Activity streams decoded into contiguous NumPy buffers.
+
+https://developers.strava.com/docs/reference/#api-Streams-getActivityStreams
+
+Each stream is one typed array (``latlng`` is ``(N, 2)``), so a multi-hour
+walk at one sample per second is a few megabytes, and derivations such as
+sniff breaks or the fastest stretch are vectorized over the whole walk.
+"""
+from itertools import chain
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel, Field
+from pydantic_core import from_json
+
+DEFAULT_STREAM_KEYS = ["time", "distance", "latlng", "altitude", "velocity_smooth", "heartrate"]
+
+STREAM_DTYPES = {
+	"time": np.int32,
+	"distance": np.float64,
+	"latlng": np.float64,
+	"altitude": np.float32,
+	"velocity_smooth": np.float32,
+	"heartrate": np.float32,
+	"cadence": np.float32,
+	"grade_smooth": np.float32,
+	"moving": np.bool_,
+}
+
+
+def _to_array(key: str, data: List[Any]) -> np.ndarray:
+	dtype = STREAM_DTYPES.get(key, np.float64)
+	if key == "latlng":
+		# Flattening pairs is about twice as fast as np.asarray on nested lists
+		return np.fromiter(chain.from_iterable(data), dtype=dtype, count=2 * len(data)).reshape(-1, 2)
+	return np.asarray(data, dtype=dtype)
+
+
+class Stop(BaseModel):
+	"""A stretch spent (nearly) standing still, e.g. a sniff break."""
+	start_time: int = Field(..., description="Seconds from the start of the activity")
+	duration: int = Field(..., description="Length of the stop, in seconds")
+	distance: float = Field(..., description="Distance into the activity, in meters")
+
+
+class ElevationProfile(BaseModel):
+	gain: float = Field(..., description="Total climb, in meters")
+	loss: float = Field(..., description="Total descent, in meters")
+	low: float = Field(..., description="Lowest altitude, in meters")
+	high: float = Field(..., description="Highest altitude, in meters")
+	profile: List[float] = Field(..., description="Altitude sampled at evenly spaced distances")
+
+
+class ActivityStreams:
+	def __init__(self, streams: Dict[str, np.ndarray]):
+		self.streams = streams
+
+	@classmethod
+	def from_json(cls, body: bytes) -> "ActivityStreams":
+		"""Decode a ``key_by_type=true`` streams response."""
+		payload: Dict[str, Any] = from_json(body)
+		streams = {
+			key: _to_array(key, stream["data"])
+			for key, stream in payload.items()
+			if stream.get("data")
+		}
+		return cls(streams)
+
+	def __getitem__(self, key: str) -> np.ndarray:
+		return self.streams[key]
+
+	def __contains__(self, key: str) -> bool:
+		return key in self.streams
+
+	def __len__(self) -> int:
+		return len(self.streams["time"]) if "time" in self.streams else 0
+
+	@property
+	def nbytes(self) -> int:
+		return sum(stream.nbytes for stream in self.streams.values())
+
+	def _is_stopped(self, speed_threshold: float) -> np.ndarray:
+		if "velocity_smooth" in self.streams:
+			return self.streams["velocity_smooth"] < speed_threshold
+		# Derive speed from time and distance when velocity was not requested
+		speed = np.gradient(self.streams["distance"], self.streams["time"].astype(np.float64))
+		return speed < speed_threshold
+
+	def stops(self, speed_threshold: float = 0.3, min_duration: int = 10) -> List[Stop]:
+		"""Stops at least ``min_duration`` seconds long."""
+		if len(self) < 2:
+			return []
+		is_stopped = self._is_stopped(speed_threshold).astype(np.int8)
+		edges = np.diff(np.concatenate(([0], is_stopped, [0])))
+		starts = np.flatnonzero(edges == 1)
+		ends = np.flatnonzero(edges == -1) - 1
+		time = self.streams["time"]
+		durations = time[ends] - time[starts]
+		keep = durations >= min_duration
+		distance = self.streams.get("distance", np.zeros(len(time)))
+		return [
+			Stop(start_time=int(time[start]), duration=int(duration), distance=float(distance[start]))
+			for start, duration in zip(starts[keep], durations[keep])
+		]
+
+	def idle_time(self, speed_threshold: float = 0.3) -> int:
+		"""Seconds spent below ``speed_threshold``."""
+		if len(self) < 2:
+			return 0
+		dt = np.diff(self.streams["time"])
+		return int(dt[self._is_stopped(speed_threshold)[1:]].sum())
+
+	def fastest_segment(self, length: float = 200.0) -> Optional[Dict[str, float]]:
+		"""Quickest ``length`` meters, as start distance, duration and speed."""
+		if len(self) < 2:
+			return None
+		distance = self.streams["distance"]
+		time = self.streams["time"]
+		ends = np.searchsorted(distance, distance + length)
+		valid = ends < len(distance)
+		if not valid.any():
+			return None
+		starts = np.flatnonzero(valid)
+		durations = time[ends[valid]] - time[starts]
+		durations = np.where(durations > 0, durations, np.iinfo(np.int32).max)
+		best = int(np.argmin(durations))
+		duration = int(durations[best])
+		return {
+			"start_distance": float(distance[starts[best]]),
+			"duration": duration,
+			"speed": length / duration,
+		}
+
+	def elevation_profile(self, samples: int = 20, spacing: float = 10.0) -> Optional[ElevationProfile]:
+		"""Gain/loss over altitude resampled every ``spacing`` meters, plus a coarse profile.
+
+		Resampling by distance smooths GPS/barometer jitter, which would
+		otherwise inflate gain when every per-second wobble is summed.
+		"""
+		if "altitude" not in self.streams or "distance" not in self.streams or len(self) < 2:
+			return None
+		altitude = self.streams["altitude"].astype(np.float64)
+		distance = self.streams["distance"]
+		resampled = np.interp(np.arange(distance[0], distance[-1], spacing), distance, altitude)
+		steps = np.diff(resampled)
+		marks = np.linspace(distance[0], distance[-1], samples)
+		return ElevationProfile(
+			gain=round(float(steps[steps > 0].sum()), 1),
+			loss=round(float(-steps[steps < 0].sum()), 1),
+			low=float(altitude.min()),
+			high=float(altitude.max()),
+			profile=np.round(np.interp(marks, distance, altitude), 1).tolist(),
+		)
@@ -0,0 +1,173 @@
+"""
+Strava OAuth token management.
+
+Tokens are refreshed ahead of expiry, concurrent callers share one in-flight
+refresh, and the rotated pair is persisted so a cold start can reuse it.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+from typing import Awaitable, Callable, Dict, Optional, Protocol
+from .models import StravaConfig, StravaToken
+
+DEFAULT_TOKEN_KEY = "default"
+
+
+class TokenStore(Protocol):
+	def load(self, key: str) -> Optional[StravaToken]: ...
+	def save(self, key: str, token: StravaToken) -> None: ...
+	def delete(self, key: str) -> None: ...
+
+
+class MemoryTokenStore:
+	"""Process-local store; tokens live as long as the (warm) process."""
+	def __init__(self):
+		self._tokens: Dict[str, StravaToken] = {}
+
+	def load(self, key: str) -> Optional[StravaToken]:
+		return self._tokens.get(key)
+
+	def save(self, key: str, token: StravaToken) -> None:
+		self._tokens[key] = token
+
+	def delete(self, key: str) -> None:
+		self._tokens.pop(key, None)
+
+
+class FileTokenStore:
+	"""JSON file store, e.g. under /tmp so it outlives a single Lambda invocation."""
+	def __init__(self, path: str):
+		self.path = path
+
+	def _read(self) -> Dict[str, dict]:
+		if not os.path.exists(self.path):
+			return {}
+		try:
+			with open(self.path) as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return {}
+
+	def load(self, key: str) -> Optional[StravaToken]:
+		data = self._read().get(key)
+		return StravaToken(**data) if data else None
+
+	def _write(self, data: Dict[str, dict]) -> None:
+		tmp_path = f"{self.path}.tmp"
+		with open(tmp_path, "w") as f:
+			json.dump(data, f)
+		os.replace(tmp_path, self.path)
+
+	def save(self, key: str, token: StravaToken) -> None:
+		data = self._read()
+		data[key] = token.model_dump()
+		self._write(data)
+
+	def delete(self, key: str) -> None:
+		data = self._read()
+		if data.pop(key, None) is not None:
+			self._write(data)
+
+
+class SQLiteTokenStore:
+	"""SQLite store, one row per token key."""
+	def __init__(self, path: str):
+		self.path = path
+		with sqlite3.connect(self.path) as conn:
+			conn.execute(
+				"CREATE TABLE IF NOT EXISTS strava_tokens ("
+				"key TEXT PRIMARY KEY, access_token TEXT NOT NULL, "
+				"refresh_token TEXT NOT NULL, expires_at INTEGER NOT NULL)"
+			)
+
+	def load(self, key: str) -> Optional[StravaToken]:
+		with sqlite3.connect(self.path) as conn:
+			row = conn.execute(
+				"SELECT access_token, refresh_token, expires_at FROM strava_tokens WHERE key = ?",
+				(key,)
+			).fetchone()
+		if not row:
+			return None
+		return StravaToken(access_token=row[0], refresh_token=row[1], expires_at=row[2])
+
+	def save(self, key: str, token: StravaToken) -> None:
+		with sqlite3.connect(self.path) as conn:
+			conn.execute(
+				"INSERT OR REPLACE INTO strava_tokens (key, access_token, refresh_token, expires_at) "
+				"VALUES (?, ?, ?, ?)",
+				(key, token.access_token, token.refresh_token, token.expires_at)
+			)
+
+	def delete(self, key: str) -> None:
+		with sqlite3.connect(self.path) as conn:
+			conn.execute("DELETE FROM strava_tokens WHERE key = ?", (key,))
+
+
+def build_token_store(settings: StravaConfig) -> TokenStore:
+	"""Build the token store selected by ``strava_token_store``."""
+	if settings.strava_token_store == "file":
+		return FileTokenStore(settings.strava_token_path)
+	if settings.strava_token_store == "sqlite":
+		return SQLiteTokenStore(settings.strava_token_path)
+	return MemoryTokenStore()
+
+
+class TokenManager:
+	"""Hands out valid access tokens, refreshing at most once at a time."""
+	def __init__(
+		self,
+		store: TokenStore,
+		refresh_token: str,
+		refresh_margin: float = 300,
+		key: str = DEFAULT_TOKEN_KEY,
+	):
+		self.store = store
+		self.key = key
+		self.refresh_margin = refresh_margin
+		self._initial_refresh_token = refresh_token
+		self._token: Optional[StravaToken] = None
+		self._is_loaded = False
+		self._lock = asyncio.Lock()
+
+	@property
+	def token(self) -> Optional[StravaToken]:
+		if not self._is_loaded:
+			self._token = self.store.load(self.key)
+			self._is_loaded = True
+		return self._token
+
+	@property
+	def refresh_token(self) -> str:
+		"""The latest refresh token; Strava may rotate it on every refresh."""
+		return self.token.refresh_token if self.token else self._initial_refresh_token
+
+	def _valid_access_token(self) -> Optional[str]:
+		token = self.token
+		if not token or token.expires_within(self.refresh_margin):
+			return None
+		return token.access_token
+
+	def invalidate(self, access_token: Optional[str] = None):
+		"""Force the next caller to refresh, e.g. after a 401.
+
+		With ``access_token``, only invalidate if it is still the current one,
+		so concurrent 401s for the same token trigger a single refresh.
+		"""
+		if self.token and access_token in (None, self.token.access_token):
+			self._token = self.token.model_copy(update={"expires_at": 0})
+
+	async def get_access_token(self, refresh: Callable[[str], Awaitable[StravaToken]]) -> str:
+		access_token = self._valid_access_token()
+		if access_token:
+			return access_token
+
+		async with self._lock:
+			# Another caller may have refreshed while we waited
+			access_token = self._valid_access_token()
+			if access_token:
+				return access_token
+			token = await refresh(self.refresh_token)
+			self._token = token
+			self.store.save(self.key, token)
+			return token.access_token
@@ -0,0 +1,196 @@
+"""
+Per-event timing spans and metrics.
+
+A trace covers one unit of work (a webhook job, a backfilled activity). Code
+on its path opens ``span``s around stages and ``record``s counters; when the
+trace closes it is written to stdout as one JSON log line, or as a CloudWatch
+Embedded Metric Format record that CloudWatch turns into metrics. With
+telemetry off no trace is ever opened, and spans and records reduce to a
+context variable lookup.
+"""
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+MODES = ("off", "json", "emf")
+
+_mode = "off"
+_namespace = "KlausStravaAI"
+_current: ContextVar[Optional["Trace"]] = ContextVar("telemetry_trace", default=None)
+_NULL_SPAN = nullcontext()
+
+# EMF units for recorded metrics; spans are always milliseconds
+UNITS = {
+    "strava_requests": "Count",
+    "strava_errors": "Count",
+    "strava_response_bytes": "Bytes",
+    "gemini_cache_hits": "Count",
+    "gemini_fallbacks": "Count",
+    "gemini_batch_retries": "Count",
+    "gemini_prompt_tokens": "Count",
+    "gemini_candidates_tokens": "Count",
+    "gemini_thoughts_tokens": "Count",
+    "gemini_cached_tokens": "Count",
+    "gemini_total_tokens": "Count",
+}
+
+
+def configure(mode: str = "off", namespace: str = "KlausStravaAI"):
+    global _mode, _namespace
+    if mode not in MODES:
+        raise ValueError(f"Unknown telemetry mode {mode!r}, expected one of {MODES}")
+    _mode = mode
+    _namespace = namespace
+
+
+def enabled() -> bool:
+    return _mode != "off"
+
+
+class Trace:
+    def __init__(self, operation: str, properties: Dict[str, Any]):
+        self.operation = operation
+        self.properties = properties
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.metrics: Dict[str, float] = {}
+        self.http: List[Dict[str, Any]] = []
+
+    def add_span(self, name: str, duration: float):
+        # Repeated stages (retries, paging) accumulate
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def add_metric(self, name: str, value: float):
+        self.metrics[name] = self.metrics.get(name, 0) + value
+
+    def log_record(self, duration: float) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            **self.properties,
+            "duration_ms": round(duration * 1000, 1),
+            "spans_ms": {name: round(value * 1000, 1) for name, value in self.spans.items()},
+            "metrics": self.metrics,
+            "http": self.http,
+        }
+
+    def emf_record(self, duration: float) -> Dict[str, Any]:
+        values = {"duration": duration * 1000}
+        values.update((f"{name}_duration", value * 1000) for name, value in self.spans.items())
+        definitions = [{"Name": name, "Unit": "Milliseconds"} for name in values]
+        values.update(self.metrics)
+        definitions.extend({"Name": name, "Unit": UNITS.get(name, "None")} for name in self.metrics)
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {"Namespace": _namespace, "Dimensions": [["Operation"]], "Metrics": definitions}
+                ],
+            },
+            "Operation": self.operation,
+            # Properties stay out of the dimensions to keep metric cardinality low
+            **self.properties,
+            **values,
+            "http": self.http,
+        }
+
+
+@contextmanager
+def _trace(operation: str, properties: Dict[str, Any]):
+    trace = Trace(operation, properties)
+    token = _current.set(trace)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.properties["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        duration = time.perf_counter() - trace.started
+        record = trace.emf_record(duration) if _mode == "emf" else trace.log_record(duration)
+        print(json.dumps(record), flush=True)
+
+
+def trace(operation: str, **properties):
+    """Open a trace for one unit of work; emitted when the block exits."""
+    if _mode == "off":
+        return _NULL_SPAN
+    return _trace(operation, properties)
+
+
+@contextmanager
+def _span(trace: Trace, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, time.perf_counter() - start)
+
+
+def span(name: str):
+    """Time a stage of the current trace."""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _span(trace, name)
+
+
+def record(name: str, value: float = 1):
+    """Add ``value`` to a metric of the current trace."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_metric(name, value)
+
+
+def record_http(response):
+    """Record an outbound Strava call: status, body size and latency."""
+    trace = _current.get()
+    if trace is None:
+        return
+    nbytes = len(response.content)
+    trace.add_metric("strava_requests", 1)
+    trace.add_metric("strava_response_bytes", nbytes)
+    if response.status_code >= 400:
+        trace.add_metric("strava_errors", 1)
+    trace.http.append({
+        "method": response.request.method,
+        "path": response.request.url.path,
+        "status": response.status_code,
+        "bytes": nbytes,
+        "ms": round(response.elapsed.total_seconds() * 1000, 1),
+    })
+
+
+def record_usage(usage_metadata):
+    """Record Gemini token usage from a response's ``usage_metadata``."""
+    trace = _current.get()
+    if trace is None or usage_metadata is None:
+        return
+    for field, name in (
+        ("prompt_token_count", "gemini_prompt_tokens"),
+        ("candidates_token_count", "gemini_candidates_tokens"),
+        ("thoughts_token_count", "gemini_thoughts_tokens"),
+        ("cached_content_token_count", "gemini_cached_tokens"),
+        ("total_token_count", "gemini_total_tokens"),
+    ):
+        value = getattr(usage_metadata, field, None)
+        if value:
+            trace.add_metric(name, value)
+
+
+def log(message: str, **fields):
+    """Log a line: plain text with telemetry off, a JSON object otherwise.
+
+    A ``traceback`` field is kept in the JSON object, or printed after the
+    message in plain text.
+    """
+    if _mode == "off":
+        print(message, flush=True)
+        if fields.get("traceback"):
+            print(fields["traceback"], end="", flush=True)
+        return
+    trace = _current.get()
+    if trace is not None:
+        fields = {"operation": trace.operation, **trace.properties, **fields}
+    print(json.dumps({"message": message, **fields}), flush=True)
@@ -0,0 +1,96 @@
+"""
+Per-activity generation vs batched generation against the local Gemini stand-in.
+
+    single  generate_post per activity, ``--concurrency`` at a time
+    batch   generate_posts with each ``--batch-sizes`` value
+
+The stand-in echoes the structured output the response schema asks for, so
+every batched post can be checked against the activity it came back for;
+the benchmark exits non-zero if any run has a missing or mismatched post.
+``--malformed-rate`` makes it drop or garble items to exercise split and retry.
+
+    python benchmarks/batch_generate.py [--activities 60] [--gemini-latency 1.0]
+        [--batch-sizes 5,10,20] [--concurrency 4] [--malformed-rate 0.0]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from fakes import FakeConfig, FakeStats, build_fake_gemini, serve
+from fixtures import large_activity
+from gemini.client import GeminiAPIClient
+from gemini.models import GeminiSettings
+from strava.models import DetailedActivity
+
+
+def build_client(base_url: str, batch_concurrency: int) -> GeminiAPIClient:
+    settings = GeminiSettings()
+    settings.gemini_api_key = "benchmark"
+    settings.gemini_base_url = base_url
+    settings.gemini_batch_concurrency = batch_concurrency
+    return GeminiAPIClient(settings)
+
+
+async def run_single(client: GeminiAPIClient, activities, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate(activity):
+        async with semaphore:
+            return activity.id, await client.generate_post(activity)
+
+    return dict(await asyncio.gather(*(generate(activity) for activity in activities)))
+
+
+def report(name: str, elapsed: float, posts, activities, stats: FakeStats) -> bool:
+    """Print one run; returns False if a post is missing or mismatched."""
+    calls = stats.calls["gemini generate"] + stats.calls["gemini generate batch"]
+    mismatched = sum(
+        1 for activity_id, post in posts.items()
+        if post.name.startswith("Walk ") and post.name != f"Walk {activity_id}"
+    )
+    print(
+        f"{name:<10} {elapsed:7.2f} s  {len(activities) / elapsed:7.1f} posts/s  "
+        f"{calls:4d} calls ({stats.calls['gemini generate batch']} batched)  "
+        f"{stats.calls['gemini prompt tokens']:7d} prompt tokens  "
+        f"{len(posts)}/{len(activities)} posts, {mismatched} mismatched"
+    )
+    return len(posts) == len(activities) and not mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--activities", type=int, default=60)
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    parser.add_argument("--batch-sizes", default="5,10,20")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    activities = []
+    for i in range(1, args.activities + 1):
+        body = large_activity(i, n_points=500)
+        body["id"] = i
+        activities.append(DetailedActivity.model_validate(body))
+
+    failed = []
+    runs = [("single", None)] + [(f"batch {size}", int(size)) for size in args.batch_sizes.split(",")]
+    for name, batch_size in runs:
+        # A fresh stand-in and client per run: no shared counters or cache
+        stats = FakeStats()
+        config = FakeConfig(gemini_latency=args.gemini_latency, malformed_rate=args.malformed_rate)
+        base_url, server = serve(build_fake_gemini(config, stats))
+        client = build_client(base_url, args.concurrency)
+        start = time.perf_counter()
+        if batch_size is None:
+            posts = asyncio.run(run_single(client, activities, args.concurrency))
+        else:
+            posts = asyncio.run(client.generate_posts(activities, batch_size=batch_size))
+        if not report(name, time.perf_counter() - start, posts, activities, stats):
+            failed.append(name)
+        server.should_exit = True
+    if failed:
+        sys.exit(f"missing or mismatched posts in: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cold-import-to-first-response through the Mangum handler, per route.
+
+Each sample is a fresh interpreter that imports ``main`` and serves one API
+Gateway event. Strava points at a closed local port and the webhook's
+self-invocation goes to a fake Lambda client, so nothing leaves the box.
+
+    python benchmarks/cold_start.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from fixtures import API_DIR
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+# Harness setup stays out of the timings
+setup = time.perf_counter()
+from fakes import FakeLambda, FakeStats
+from fixtures import LambdaContext, api_gateway_event, webhook_event
+context = LambdaContext()
+main.get_lambda_invoker(context.function_name).client = FakeLambda(FakeStats())
+start += time.perf_counter() - setup
+if sys.argv[1] == "GET":
+    event = api_gateway_event("GET", "/strava/webhook", query={"hub.challenge": "abc"})
+else:
+    event = api_gateway_event("POST", "/strava/webhook", body=json.dumps(webhook_event(1)))
+response = main.handler(event, context)
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "total": done - start, "status": response["statusCode"]}))
+"""
+
+ENV = {
+    "STRAVA_CLIENT_ID": "1",
+    "STRAVA_CLIENT_SECRET": "benchmark",
+    "STRAVA_REFRESH_TOKEN": "benchmark",
+    "STRAVA_BASE_URL": "http://127.0.0.1:9",
+    "GEMINI_API_KEY": "benchmark",
+}
+
+
+def sample(method: str) -> dict:
+    benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, method],
+        cwd=API_DIR,
+        env={**os.environ, **ENV, "PYTHONPATH": os.pathsep.join([API_DIR, benchmarks_dir])},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    if probe["status"] != 200:
+        sys.exit(f"{method} returned {probe['status']}; timings would measure an error path")
+    return probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for method in ("GET", "POST"):
+        samples = [sample(method) for _ in range(args.runs)]
+        imports = statistics.median(s["import"] for s in samples) * 1e3
+        totals = statistics.median(s["total"] for s in samples) * 1e3
+        statuses = sorted({s["status"] for s in samples})
+        print(f"{method:<5} import={imports:7.1f} ms  first response={totals:7.1f} ms  status={statuses}")
+
+
+if __name__ == "__main__":
+    main()
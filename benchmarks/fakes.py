@@ -0,0 +1,174 @@
+"""
+Local stand-ins for the Strava and Gemini APIs.
+
+Both are small FastAPI apps served by uvicorn on localhost, with configurable
+latency, error rate and Strava rate limiting, and they count every call so a
+benchmark can report outbound traffic per event.
+"""
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import List, Tuple
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from pydantic import BaseModel
+from fixtures import large_activity
+
+STRAVA_WINDOWS = (15 * 60, 24 * 60 * 60)
+
+
+class FakeConfig(BaseModel):
+    strava_latency: float = 0.05
+    gemini_latency: float = 1.0
+    error_rate: float = 0.0
+    rate_limit_429_rate: float = 0.0
+    # Share of batch items Gemini drops or returns without a name
+    malformed_rate: float = 0.0
+    # Strava's default application limits: 15-minute, daily
+    rate_limit: Tuple[int, int] = (200, 2000)
+    read_rate_limit: Tuple[int, int] = (100, 1000)
+    seed: int = 0
+
+
+class FakeStats:
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def record(self, name: str, count: int = 1):
+        self.calls[name] += count
+
+
+def build_fake_strava(config: FakeConfig, stats: FakeStats) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    # Requests per (kind, window length, window start); windows reset on
+    # quarter-hours and at midnight UTC, as Strava's do
+    usage: Counter = Counter()
+
+    def current_usage(kind: str) -> Tuple[int, int]:
+        now = time.time()
+        return tuple(usage[kind, window, int(now // window)] for window in STRAVA_WINDOWS)
+
+    def rate_limit_headers() -> dict:
+        return {
+            "X-RateLimit-Limit": ",".join(map(str, config.rate_limit)),
+            "X-RateLimit-Usage": ",".join(map(str, current_usage("overall"))),
+            "X-ReadRateLimit-Limit": ",".join(map(str, config.read_rate_limit)),
+            "X-ReadRateLimit-Usage": ",".join(map(str, current_usage("read"))),
+        }
+
+    def over_limit(kind: str, limits: Tuple[int, int]) -> bool:
+        return any(used > limit for used, limit in zip(current_usage(kind), limits))
+
+    async def strava_response(name: str, is_read: bool, body: dict) -> Response:
+        await asyncio.sleep(config.strava_latency)
+        now = time.time()
+        for window in STRAVA_WINDOWS:
+            usage["overall", window, int(now // window)] += 1
+            usage["read", window, int(now // window)] += is_read
+        if (
+            rng.random() < config.rate_limit_429_rate
+            or over_limit("overall", config.rate_limit)
+            or (is_read and over_limit("read", config.read_rate_limit))
+        ):
+            stats.record(f"{name} 429")
+            return Response(json.dumps({"message": "Rate Limit Exceeded"}), 429, rate_limit_headers(), "application/json")
+        if rng.random() < config.error_rate:
+            stats.record(f"{name} 500")
+            return Response(json.dumps({"message": "Error"}), 500, rate_limit_headers(), "application/json")
+        stats.record(name)
+        return Response(json.dumps(body), 200, rate_limit_headers(), "application/json")
+
+    @app.post("/oauth/token")
+    async def token():
+        stats.record("strava token")
+        await asyncio.sleep(config.strava_latency)
+        return {"access_token": "fake", "refresh_token": "fake", "expires_at": int(time.time()) + 21600}
+
+    @app.get("/activities/{activity_id}")
+    async def get_activity(activity_id: int):
+        activity = large_activity(activity_id % 50, n_points=2000)
+        activity["id"] = activity_id
+        return await strava_response("strava GET activity", True, activity)
+
+    @app.put("/activities/{activity_id}")
+    async def update_activity(activity_id: int, request: Request):
+        activity = large_activity(activity_id % 50, n_points=2000)
+        activity.update(await request.json(), id=activity_id)
+        return await strava_response("strava PUT activity", False, activity)
+
+    return app
+
+
+def build_fake_gemini(config: FakeConfig, stats: FakeStats) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed + 1)
+
+    @app.post("/{api_version}/models/{model_action}")
+    async def generate_content(api_version: str, model_action: str, request: Request):
+        body = await request.json()
+        await asyncio.sleep(config.gemini_latency)
+        if rng.random() < config.error_rate:
+            stats.record("gemini 500")
+            return Response(json.dumps({"error": {"code": 500, "message": "Error", "status": "INTERNAL"}}), 500)
+        prompt = body["contents"][0]["parts"][0]["text"]
+        instructions = "".join(part["text"] for part in body.get("systemInstruction", {}).get("parts", []))
+        if prompt.startswith("["):
+            # Batch: echo one post per activity id, as the response schema asks
+            stats.record("gemini generate batch")
+            output = []
+            for item in json.loads(prompt):
+                roll = rng.random()
+                if roll < config.malformed_rate / 2:
+                    continue
+                post = {"activity_id": item["activity_id"], "description": f"Sniffed activity {item['activity_id']}."}
+                if roll >= config.malformed_rate:
+                    post["name"] = f"Walk {item['activity_id']}"
+                output.append(post)
+        else:
+            stats.record("gemini generate")
+            activity_id = json.loads(prompt).get("activity_id")
+            output = {"name": f"Walk {activity_id}" if activity_id else "Fake Walk", "description": f"Sniffed {len(prompt)} bytes of prompt."}
+        prompt_tokens = (len(prompt) + len(instructions)) // 4
+        output_tokens = len(json.dumps(output)) // 4
+        stats.record("gemini prompt tokens", prompt_tokens)
+        return {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": json.dumps(output)}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens, "totalTokenCount": prompt_tokens + output_tokens},
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app: FastAPI) -> Tuple[str, uvicorn.Server]:
+    """Run ``app`` on a background thread; returns its base URL and server."""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}", server
+
+
+class FakeLambda:
+    """A boto3 Lambda client that holds asynchronous invocations for the
+    caller to run, instead of sending them to AWS."""
+    def __init__(self, stats: FakeStats):
+        self.stats = stats
+        self.pending: List[dict] = []
+
+    def invoke(self, FunctionName: str, InvocationType: str, Payload: bytes):
+        self.stats.record("lambda invoke")
+        self.pending.append(json.loads(Payload))
+        return {"StatusCode": 202}
+
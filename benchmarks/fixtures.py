@@ -0,0 +1,270 @@
+"""
+Synthetic Strava fixtures for the benchmarks.
+
+Activities are deterministic for a given seed and sized like long Fi collar
+walks: dense polylines plus full segment efforts, laps, splits and best efforts.
+"""
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+HOME = (30.2672, -97.7431)
+
+
+def encode_polyline(points: List[Tuple[float, float]], precision: int = 5) -> str:
+    """Google encoded polyline format."""
+    factor = 10 ** precision
+    chunks = []
+    prev_lat = prev_lng = 0
+    for lat, lng in points:
+        ilat, ilng = round(lat * factor), round(lng * factor)
+        for delta in (ilat - prev_lat, ilng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        prev_lat, prev_lng = ilat, ilng
+    return "".join(chunks)
+
+
+def walk_points(n_points: int, rng: random.Random) -> List[Tuple[float, float]]:
+    """A meandering loop that starts and ends near HOME."""
+    lat, lng = HOME
+    heading = rng.uniform(0, 2 * math.pi)
+    points = []
+    for i in range(n_points):
+        heading += rng.gauss(0, 0.3)
+        # Bend back towards home over the second half of the walk
+        if i > n_points // 2:
+            home_heading = math.atan2(HOME[0] - lat, HOME[1] - lng)
+            heading += 0.2 * math.sin(home_heading - heading)
+        lat += 0.00005 * math.sin(heading)
+        lng += 0.00005 * math.cos(heading)
+        points.append((lat, lng))
+    return points
+
+
+def _effort(i: int, start: datetime, rng: random.Random) -> Dict[str, Any]:
+    elapsed = rng.randint(60, 900)
+    return {
+        "id": 1000000 + i,
+        "resource_state": 2,
+        "name": f"Segment {i}",
+        "elapsed_time": elapsed,
+        "moving_time": elapsed - rng.randint(0, 30),
+        "start_date": (start + timedelta(seconds=i * 60)).isoformat().replace("+00:00", "Z"),
+        "start_date_local": (start + timedelta(seconds=i * 60)).replace(tzinfo=None).isoformat() + "Z",
+        "distance": rng.uniform(100, 3000),
+        "start_index": i * 10,
+        "end_index": i * 10 + 50,
+        "average_heartrate": rng.uniform(90, 150),
+        "max_heartrate": rng.uniform(150, 180),
+    }
+
+
+def _split(i: int, rng: random.Random) -> Dict[str, Any]:
+    moving = rng.randint(500, 800)
+    return {
+        "distance": 1000.0,
+        "elapsed_time": moving + rng.randint(0, 120),
+        "elevation_difference": rng.uniform(-10, 10),
+        "moving_time": moving,
+        "split": i + 1,
+        "average_speed": 1000 / moving,
+        "pace_zone": 0,
+    }
+
+
+def _lap(i: int, start: datetime, rng: random.Random) -> Dict[str, Any]:
+    effort = _effort(i, start, rng)
+    effort.update({
+        "lap_index": i + 1,
+        "max_speed": rng.uniform(2, 4),
+        "average_speed": rng.uniform(1, 2),
+        "total_elevation_gain": rng.uniform(0, 20),
+    })
+    for key in ("average_heartrate", "max_heartrate"):
+        effort.pop(key)
+    return effort
+
+
+def large_activity(seed: int = 0, n_points: int = 4000, n_efforts: int = 40) -> Dict[str, Any]:
+    """A DetailedActivity JSON payload the size of a long walk."""
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 1, 7, 30, tzinfo=timezone.utc) + timedelta(days=seed, hours=rng.randint(0, 12))
+    points = walk_points(n_points, rng)
+    polyline = encode_polyline(points)
+    distance = n_points * 5.5
+    moving_time = int(distance / 1.3)
+    return {
+        "id": 12000000000 + seed,
+        "resource_state": 3,
+        "external_id": f"fi-{seed}.gpx",
+        "upload_id": 13000000000 + seed,
+        "athlete": {"id": 4242, "resource_state": 1},
+        "name": "Morning Walk",
+        "distance": distance,
+        "moving_time": moving_time,
+        "elapsed_time": moving_time + rng.randint(60, 900),
+        "total_elevation_gain": rng.uniform(5, 80),
+        "type": "Walk",
+        "sport_type": "Walk",
+        "start_date": start.isoformat().replace("+00:00", "Z"),
+        "start_date_local": (start - timedelta(hours=6)).replace(tzinfo=None).isoformat() + "Z",
+        "timezone": "(GMT-06:00) America/Chicago",
+        "utc_offset": -21600.0,
+        "location_city": "Austin",
+        "location_state": "Texas",
+        "location_country": "United States",
+        "achievement_count": rng.randint(0, 5),
+        "kudos_count": rng.randint(0, 20),
+        "comment_count": 0,
+        "athlete_count": 1,
+        "photo_count": 0,
+        "map": {"id": f"a{seed}", "polyline": polyline, "summary_polyline": encode_polyline(points[::10])},
+        "trainer": False,
+        "commute": False,
+        "manual": False,
+        "private": False,
+        "flagged": False,
+        "workout_type": None,
+        "upload_id_str": str(13000000000 + seed),
+        "average_speed": distance / moving_time,
+        "max_speed": rng.uniform(2.5, 4.5),
+        "has_kudoed": False,
+        "hide_from_home": False,
+        "gear_id": None,
+        "description": "Walk with Klaus tracked by Fi",
+        "calories": rng.uniform(100, 400),
+        "segment_efforts": [_effort(i, start, rng) for i in range(n_efforts)],
+        "device_name": "Fi Series 3",
+        "embed_token": "0123456789abcdef" * 2,
+        "splits_metric": [_split(i, rng) for i in range(int(distance // 1000))],
+        "splits_standard": [_split(i, rng) for i in range(int(distance // 1609))],
+        "laps": [_lap(i, start, rng) for i in range(n_efforts // 4)],
+        "best_efforts": [_effort(i, start, rng) | {"name": name} for i, name in enumerate(["400m", "1/2 mile", "1K", "1 mile", "2 mile", "5K"])],
+        "start_latlng": list(points[0]),
+        "end_latlng": list(points[-1]),
+        "pr_count": rng.randint(0, 3),
+        "total_photo_count": 0,
+        "has_heartrate": True,
+        "average_heartrate": rng.uniform(90, 130),
+        "max_heartrate": rng.uniform(150, 180),
+        "elev_high": rng.uniform(150, 200),
+        "elev_low": rng.uniform(120, 150),
+    }
+
+
+def activity_corpus(size: int = 20, n_points: int = 4000) -> List[Dict[str, Any]]:
+    return [large_activity(seed, n_points=n_points) for seed in range(size)]
+
+
+def webhook_event(object_id: int, aspect_type: str = "create", owner_id: int = 4242) -> Dict[str, Any]:
+    """A StravaWebhookEvent body."""
+    return {
+        "object_type": "activity",
+        "object_id": object_id,
+        "aspect_type": aspect_type,
+        "updates": {},
+        "owner_id": owner_id,
+        "subscription_id": 1,
+        "event_time": 1740000000 + object_id,
+    }
+
+
+def api_gateway_event(method: str, path: str, query: Dict[str, str] = None, body: str = None) -> Dict[str, Any]:
+    """An API Gateway REST (v1) proxy event, as Lambda hands it to Mangum."""
+    headers = {"content-type": "application/json", "host": "example.execute-api.us-west-1.amazonaws.com"}
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": query,
+        "multiValueQueryStringParameters": {key: [value] for key, value in query.items()} if query else None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": method,
+            "path": f"/prod{path}",
+            "stage": "prod",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+class LambdaContext:
+    function_name = "klaus-strava-ai"
+    aws_request_id = "benchmark"
+
+
+def activity_streams(seconds: int = 36000, seed: int = 0) -> Dict[str, Any]:
+    """A ``key_by_type=true`` streams payload at one sample per second.
+
+    The dog walks at ~1.3 m/s with frequent sniff breaks.
+    """
+    rng = random.Random(seed)
+    points = walk_points(seconds, rng)
+    time, distance, velocity, altitude, heartrate = [], [], [], [], []
+    total = 0.0
+    alt = 150.0
+    stopped_for = 0
+    for t in range(seconds):
+        if stopped_for == 0 and rng.random() < 0.01:
+            stopped_for = rng.randint(5, 90)
+        speed = 0.0 if stopped_for else max(0.0, rng.gauss(1.3, 0.3))
+        stopped_for = max(0, stopped_for - 1)
+        total += speed
+        alt += rng.gauss(0, 0.05) + 0.002 * math.sin(t / 600)
+        time.append(t)
+        distance.append(round(total, 1))
+        velocity.append(round(speed, 2))
+        altitude.append(round(alt, 1))
+        heartrate.append(rng.randint(80, 140))
+
+    def stream(data, series_type="distance"):
+        return {"data": data, "series_type": series_type, "original_size": seconds, "resolution": "high"}
+
+    return {
+        "time": stream(time),
+        "distance": stream(distance),
+        "latlng": stream([[round(lat, 6), round(lng, 6)] for lat, lng in points]),
+        "altitude": stream(altitude),
+        "velocity_smooth": stream(velocity),
+        "heartrate": stream(heartrate),
+    }
+
+
+def webhook_trace(
+    size: int = 200, duplicate_rate: float = 0.1, update_rate: float = 0.2, athletes: int = 1, seed: int = 0
+) -> List[Dict[str, Any]]:
+    """Webhook events as Strava delivers them: creates, redeliveries and updates,
+    spread over ``athletes`` owners starting at 4242."""
+    rng = random.Random(seed)
+    events = []
+    next_id = 1
+    while len(events) < size:
+        roll = rng.random()
+        if events and roll < duplicate_rate:
+            events.append(dict(rng.choice(events)))
+        elif next_id > 1 and roll < duplicate_rate + update_rate:
+            object_id = rng.randint(1, next_id - 1)
+            event = webhook_event(object_id, aspect_type="update", owner_id=4242 + object_id % athletes)
+            event["updates"] = {"title": "Renamed"}
+            events.append(event)
+        else:
+            events.append(webhook_event(next_id, owner_id=4242 + next_id % athletes))
+            next_id += 1
+    return events
@@ -0,0 +1,52 @@
+"""
+Per-package import cost of the Lambda entry point (``python -X importtime``).
+
+    python benchmarks/import_profile.py [--module main] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from fixtures import API_DIR
+
+
+def import_times(module: str) -> list:
+    """(self_us, cumulative_us, name) for every module imported by ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env={**os.environ, "PYTHONPATH": API_DIR},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    by_package = defaultdict(int)
+    for self_us, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+
+    print(f"import {args.module}: {total / 1e3:.1f} ms across {len(rows)} modules")
+    print(f"{'package':<24}{'ms':>10}{'share':>8}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{package:<24}{self_us / 1e3:>10.1f}{self_us / total:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+End-to-end load test: replay webhook traces against the app, with Strava and
+Gemini replaced by local fakes.
+
+The ``asgi`` mode drives the FastAPI app concurrently, like a warm container
+behind a load balancer, and waits for the worker pool to drain. The ``mangum``
+mode feeds API Gateway events through the Lambda handler one at a time; each
+job the webhook hands to an asynchronous self-invocation then runs as its own
+handler call, as in a single warm Lambda environment. Both report
+acknowledgement latency, throughput and the outbound calls each mode made.
+
+    python benchmarks/load_test.py [--mode asgi|mangum] [--events 200]
+        [--trace events.jsonl] [--gemini-latency 1.0] [--error-rate 0.0]
+        [--rate-limit-429-rate 0.0] [--rate-limit 1000,10000]
+        [--read-rate-limit 500,5000] [--athletes 1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+from fakes import FakeConfig, FakeLambda, FakeStats, build_fake_gemini, build_fake_strava, serve
+from fixtures import LambdaContext, api_gateway_event, webhook_trace
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def load_trace(path: str, size: int, athletes: int) -> List[dict]:
+    if not path:
+        return webhook_trace(size, athletes=athletes)
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def run_asgi(trace: List[dict], concurrency: int):
+    import httpx
+    import main
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+
+            async def deliver(event: dict):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/strava/webhook", json=event)
+                    latencies.append(time.perf_counter() - start)
+                    return response.status_code
+
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(deliver(event) for event in trace))
+            acked = time.perf_counter()
+            await main.get_worker_pool().drain()
+            drained = time.perf_counter()
+    return latencies, statuses, acked - start, drained - start
+
+
+def run_mangum(trace: List[dict], stats: FakeStats, job_latencies: List[float], max_attempts: int = 3):
+    import main
+
+    latencies, statuses = [], []
+    context = LambdaContext()
+    fake_lambda = FakeLambda(stats)
+    main.get_lambda_invoker(context.function_name).client = fake_lambda
+    start = time.perf_counter()
+    for event in trace:
+        request = api_gateway_event("POST", "/strava/webhook", body=json.dumps(event))
+        sent = time.perf_counter()
+        response = main.handler(request, context)
+        latencies.append(time.perf_counter() - sent)
+        statuses.append(response["statusCode"])
+        # Lambda runs the self-invocation, retrying twice if it raises
+        while fake_lambda.pending:
+            job_event = fake_lambda.pending.pop(0)
+            for attempt in range(max_attempts):
+                sent = time.perf_counter()
+                try:
+                    main.handler(job_event, context)
+                    break
+                except Exception:
+                    stats.record("lambda job failed")
+                finally:
+                    job_latencies.append(time.perf_counter() - sent)
+    done = time.perf_counter()
+    return latencies, statuses, sum(latencies), done - start
+
+
+def limit_pair(value: str) -> Tuple[int, int]:
+    short, daily = value.split(",")
+    return int(short), int(daily)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["asgi", "mangum"], default="asgi")
+    parser.add_argument("--events", type=int, default=200, help="synthetic trace size")
+    parser.add_argument("--trace", help="JSONL file of webhook event bodies to replay")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent deliveries (asgi)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--athletes", type=int, default=1, help="owners in the synthetic trace, each registered")
+    parser.add_argument("--strava-latency", type=float, default=0.05)
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-429-rate", type=float, default=0.0)
+    # Above Strava's defaults (200,2000 and 100,1000) so the default trace
+    # doesn't end up waiting for the fake's 15-minute window to reset
+    parser.add_argument("--rate-limit", type=limit_pair, default=(1000, 10000), help="15-minute,daily limit")
+    parser.add_argument("--read-rate-limit", type=limit_pair, default=(500, 5000), help="15-minute,daily read limit")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        strava_latency=args.strava_latency,
+        gemini_latency=args.gemini_latency,
+        error_rate=args.error_rate,
+        rate_limit_429_rate=args.rate_limit_429_rate,
+        rate_limit=args.rate_limit,
+        read_rate_limit=args.read_rate_limit,
+    )
+    stats = FakeStats()
+    strava_url, _ = serve(build_fake_strava(config, stats))
+    gemini_url, _ = serve(build_fake_gemini(config, stats))
+    os.environ.update(
+        STRAVA_CLIENT_ID="1",
+        STRAVA_CLIENT_SECRET="benchmark",
+        STRAVA_REFRESH_TOKEN="benchmark",
+        STRAVA_BASE_URL=strava_url,
+        GEMINI_API_KEY="benchmark",
+        GEMINI_BASE_URL=gemini_url,
+        WEBHOOK_WORKERS=str(args.workers),
+        WEBHOOK_RETRY_BACKOFF="0.1",
+    )
+    if args.athletes > 1:
+        from athletes import AthleteRecord, SQLiteAthleteStore
+        from gemini.models import Persona
+
+        athletes_path = os.path.join(tempfile.mkdtemp(), "athletes.db")
+        store = SQLiteAthleteStore(athletes_path)
+        for i in range(args.athletes):
+            persona = Persona(name=f"Dog {i}")
+            store.save(AthleteRecord(athlete_id=4242 + i, refresh_token=f"refresh-{i}", persona=persona))
+        os.environ.update(STRAVA_ATHLETE_STORE="sqlite", STRAVA_ATHLETE_PATH=athletes_path)
+
+    trace = load_trace(args.trace, args.events, args.athletes)
+    job_latencies: List[float] = []
+    if args.mode == "asgi":
+        latencies, statuses, ack_time, total_time = asyncio.run(run_asgi(trace, args.concurrency))
+    else:
+        latencies, statuses, ack_time, total_time = run_mangum(trace, stats, job_latencies)
+
+    import main as app_main
+
+    creates = len({event["object_id"] for event in trace if event["aspect_type"] == "create"})
+    owners = len({event["owner_id"] for event in trace})
+    consumers = f"{args.workers} workers" if args.mode == "asgi" else "Lambda self-invocations"
+    print(f"{args.mode}: {len(trace)} events, {creates} distinct activities, {owners} athletes, {consumers}")
+    for name, samples in (("ack", latencies), ("job", job_latencies)):
+        if not samples:
+            continue
+        print(
+            f"  {name:<8} p50 {percentile(samples, 0.5) * 1000:7.2f} ms"
+            f"   p95 {percentile(samples, 0.95) * 1000:7.2f} ms"
+            f"   p99 {percentile(samples, 0.99) * 1000:7.2f} ms"
+            f"   mean {statistics.mean(samples) * 1000:7.2f} ms"
+        )
+    print(f"  acked    {len(trace) / ack_time:9.1f} events/s ({ack_time:.2f} s)")
+    print(f"  captioned {creates / total_time:8.1f} activities/s ({total_time:.2f} s until done)")
+    print(f"  statuses {dict(sorted((s, statuses.count(s)) for s in set(statuses)))}")
+    if args.mode == "asgi":
+        print(f"  dead letters {len(app_main.get_worker_pool().queue.dead_letters())}")
+    for name, count in sorted(stats.calls.items()):
+        print(f"  {name:<24} {count:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Parsing a Strava activity response: the old eager path vs bytes + lazy sub-models.
+
+    eager   DetailedActivity(**response.json()) with every nested model validated
+    lazy    DetailedActivity.model_validate_json(response.content)
+
+Reports CPU time and peak allocation (tracemalloc) per activity for the
+webhook access pattern, which reads only a few scalars.
+
+    python benchmarks/parse_activity.py [--corpus 20] [--points 4000] [--efforts 40]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from typing import List, Optional
+from fixtures import large_activity
+from strava.models import DetailedActivity, DetailedSegmentEffort, Lap, Split
+
+
+class EagerDetailedActivity(DetailedActivity):
+    """DetailedActivity as it was before lazy collections."""
+    segment_efforts: Optional[List[DetailedSegmentEffort]] = None
+    splits_metric: Optional[List[Split]] = None
+    splits_standard: Optional[List[Split]] = None
+    laps: Optional[List[Lap]] = None
+    best_efforts: Optional[List[DetailedSegmentEffort]] = None
+
+
+def eager(body: bytes) -> float:
+    return EagerDetailedActivity(**json.loads(body)).distance
+
+
+def lazy(body: bytes) -> float:
+    return DetailedActivity.model_validate_json(body).distance
+
+
+def measure(name: str, parse, bodies: List[bytes], repeat: int = 5):
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        for body in bodies:
+            parse(body)
+        timings.append((time.process_time() - start) / len(bodies))
+    tracemalloc.start()
+    parse(bodies[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cpu_us = statistics.median(timings) * 1e6
+    print(f"{name:<6} cpu={cpu_us:>9.1f} us/activity  peak alloc={peak / 1024:>8.1f} KiB")
+    return cpu_us, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=int, default=20)
+    parser.add_argument("--points", type=int, default=4000)
+    parser.add_argument("--efforts", type=int, default=40)
+    args = parser.parse_args()
+
+    corpus = [large_activity(seed, args.points, args.efforts) for seed in range(args.corpus)]
+    bodies = [json.dumps(activity).encode() for activity in corpus]
+    print(f"{len(bodies)} activities, {statistics.mean(map(len, bodies)) / 1024:.1f} KiB each")
+    eager_cpu, eager_peak = measure("eager", eager, bodies)
+    lazy_cpu, lazy_peak = measure("lazy", lazy, bodies)
+    print(f"cpu {eager_cpu / lazy_cpu:.1f}x faster, peak alloc {eager_peak / lazy_peak:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Polyline decoding and route metrics on long walk polylines.
+
+    python benchmarks/polyline_decode.py [--points 20000] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from fixtures import large_activity
+from strava.polyline import decode_polyline, decode_polyline_py, route_metrics
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    polyline = large_activity(0, n_points=args.points, n_efforts=0)["map"]["polyline"]
+    points = decode_polyline(polyline)
+    assert np.allclose(points, decode_polyline_py(polyline)), "vectorized decoder disagrees with reference"
+    # 5 km due east with points 100 m apart: sparse points must not read as turns
+    step_deg = 100 / (111_320 * np.cos(np.radians(47.6)))
+    straight = np.column_stack((np.full(51, 47.6), -122.3 + np.arange(51) * step_deg))
+    assert route_metrics(straight).turn_count == 0, "straight route reported turns"
+
+    print(f"{len(polyline)} chars, {len(points)} points, {points.nbytes / 1024:.0f} KiB as float64")
+    reference = timed(lambda: decode_polyline_py(polyline), args.repeat)
+    vectorized = timed(lambda: decode_polyline(polyline), args.repeat)
+    metrics = timed(lambda: route_metrics(points), args.repeat)
+    print(f"decode (pure Python) {reference:8.2f} ms")
+    print(f"decode (NumPy)       {vectorized:8.2f} ms  ({reference / vectorized:.1f}x)")
+    print(f"route metrics        {metrics:8.2f} ms")
+    print(route_metrics(points))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Prompt size and serialization time: full model_dump_json vs compact features.
+
+Token counts are estimated at ~4 characters per token, the rule of thumb for
+Gemini text, so no API key is needed.
+
+    python benchmarks/prompt_tokens.py [--corpus 20] [--points 4000] [--max-fields 20]
+"""
+import argparse
+import json
+import statistics
+import time
+from fixtures import activity_corpus
+from strava.models import DetailedActivity
+from gemini.prompt import serialize_activity
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def measure(name: str, serialize, activities, repeat: int = 5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        texts = [serialize(activity) for activity in activities]
+        timings.append((time.perf_counter() - start) / len(activities))
+    tokens = [estimate_tokens(text) for text in texts]
+    print(
+        f"{name:<10} tokens mean={statistics.mean(tokens):>8.0f} max={max(tokens):>8}  "
+        f"serialize={statistics.median(timings) * 1e6:>8.1f} us/activity"
+    )
+    return statistics.mean(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", type=int, default=20)
+    parser.add_argument("--points", type=int, default=4000)
+    parser.add_argument("--max-fields", type=int, default=20)
+    args = parser.parse_args()
+
+    activities = [DetailedActivity(**data) for data in activity_corpus(args.corpus, args.points)]
+    before = measure("full", lambda a: a.model_dump_json(), activities)
+    after = measure("compact", lambda a: serialize_activity(a, args.max_fields), activities)
+    print(f"token reduction: {before / after:.1f}x")
+    print("sample:", json.dumps(json.loads(serialize_activity(activities[0], args.max_fields)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
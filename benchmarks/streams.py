@@ -0,0 +1,52 @@
+"""
+Activity streams: decode into NumPy buffers and run the derivations.
+
+Compares buffer size against the decoded JSON lists the same data would
+otherwise live in.
+
+    python benchmarks/streams.py [--seconds 36000] [--repeat 10]
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from fixtures import activity_streams
+from strava.streams import ActivityStreams
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=36000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    body = json.dumps(activity_streams(args.seconds)).encode()
+    tracemalloc.start()
+    lists = json.loads(body)
+    list_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del lists
+
+    streams = ActivityStreams.from_json(body)
+    print(f"{len(streams)} samples, {len(body) / 2**20:.1f} MiB JSON")
+    print(f"NumPy buffers {streams.nbytes / 2**20:6.2f} MiB vs Python lists {list_bytes / 2**20:6.2f} MiB")
+    print(f"decode            {timed(lambda: ActivityStreams.from_json(body), args.repeat):8.2f} ms")
+    print(f"stops             {timed(streams.stops, args.repeat):8.2f} ms  ({len(streams.stops())} stops)")
+    print(f"idle time         {timed(streams.idle_time, args.repeat):8.2f} ms  ({streams.idle_time()} s)")
+    print(f"fastest 200 m     {timed(streams.fastest_segment, args.repeat):8.2f} ms  {streams.fastest_segment()}")
+    profile = streams.elevation_profile()
+    print(f"elevation profile {timed(streams.elevation_profile, args.repeat):8.2f} ms  gain={profile.gain} loss={profile.loss}")
+
+
+if __name__ == "__main__":
+    main()
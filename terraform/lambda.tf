@@ -124,6 +124,25 @@ resource "aws_iam_role_policy" "lambda_s3_policy" {
   policy = data.aws_iam_policy_document.lambda_s3_policy.json
 }
 
+# The webhook hands each job to an asynchronous invocation of the function
+data "aws_iam_policy_document" "lambda_self_invoke_policy" {
+  statement {
+    effect = "Allow"
+    actions = [
+      "lambda:InvokeFunction"
+    ]
+    resources = [
+      aws_lambda_function.lambda-function.arn
+    ]
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_self_invoke_policy" {
+  name   = "lambda_self_invoke"
+  role   = aws_iam_role.lambda-iam-role.id
+  policy = data.aws_iam_policy_document.lambda_self_invoke_policy.json
+}
+
 # Attach basic execution role for CloudWatch logs
 resource "aws_iam_role_policy_attachment" "lambda_basic_execution" {
   policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"